@@ -0,0 +1,62 @@
+"""
+Shared password hashing context for the BRIDGE API and data layer.
+
+Both api.userHandler and data_layer.mongoHandler hash and verify passwords;
+they import the context from here so the passlib backends are probed once
+per process. Logins for unknown users are verified against a dummy hash so
+they take as long as a wrong password. Async callers run hashing on a
+dedicated thread pool so logins don't queue behind long-running work in the
+event loop's default executor.
+"""
+
+import os
+import asyncio
+import secrets
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+
+# Password hashing configuration
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],  # argon2id for new hashes, bcrypt kept to verify legacy ones
+    default="argon2",
+    deprecated="auto",             # bcrypt hashes are rehashed on the next successful login
+    argon2__type="ID",
+    argon2__time_cost=int(os.getenv("ARGON2_TIME_COST", "2")),
+    argon2__memory_cost=int(os.getenv("ARGON2_MEMORY_COST", "65536")),  # KiB
+    argon2__parallelism=max(1, (os.cpu_count() or 2) // 2)
+)
+
+# Bound methods, so hot paths skip the attribute lookup on the context
+hash_password = pwd_context.hash
+verify_password = pwd_context.verify
+verify_and_update_password = pwd_context.verify_and_update
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    """Hash of a random secret, computed once per process."""
+    return hash_password(secrets.token_urlsafe(16))
+
+def verify_dummy_password(password: str) -> bool:
+    """Verify against the dummy hash so a missing user costs the same as a wrong password. Always False."""
+    verify_password(password, _dummy_hash())
+    return False
+
+# Each argon2 hash already uses cpu_count // 2 lanes, so two workers keep the CPU busy
+_hash_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", "2")),
+    thread_name_prefix="password-hash"
+)
+
+async def run_in_hash_pool(func, *args):
+    """Run a blocking password-hashing call on the dedicated hashing thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+
+__all__ = [
+    "pwd_context",
+    "hash_password",
+    "verify_password",
+    "verify_and_update_password",
+    "verify_dummy_password",
+    "run_in_hash_pool"
+]
@@ -20,9 +20,9 @@ Dependencies:
 
 import os
 import json
+import time
 import logging
 from typing import Optional, Dict, Any
-from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 from fastapi import Request, HTTPException, status
@@ -148,8 +148,8 @@ async def verify_api_key(api_key: str) -> Optional[Dict[str, Any]]:
     
     # If not found in environment, check the database
     try:
-        from data_layer.mongoHandler import db_handler
-        user_doc = db_handler.users.find_one({"api_key": api_key})
+        from data_layer.mongoHandler import get_async_db_handler
+        user_doc = await get_async_db_handler().users.find_one({"api_key": api_key})
         if user_doc:
             return {
                 "username": user_doc.get("username"),
@@ -158,7 +158,7 @@ async def verify_api_key(api_key: str) -> Optional[Dict[str, Any]]:
                 "id": str(user_doc.get("_id"))
             }
     except Exception as e:
-        logger.error(f"Error verifying API key in database: {str(e)}")
+        logger.error("Error verifying API key in database: %s", e)
     
     return None
 
@@ -196,7 +196,7 @@ async def get_user(request: Request) -> Optional[Dict[str, Any]]:
         }
         
     except Exception as e:
-        logger.error(f"Error getting user: {e}")
+        logger.error("Error getting user: %s", e)
         return None
 
 async def log_request(request: Request, call_next):
@@ -213,7 +213,7 @@ async def log_request(request: Request, call_next):
     Returns:
         The HTTP response
     """
-    start_time = datetime.utcnow()
+    start_time = time.perf_counter()
     
     # Log request details
     logger.info(
@@ -225,7 +225,7 @@ async def log_request(request: Request, call_next):
     response = await call_next(request)
     
     # Calculate processing time
-    process_time = (datetime.utcnow() - start_time).total_seconds() * 1000
+    process_time = (time.perf_counter() - start_time) * 1000
     
     # Log response details
     logger.info(
@@ -56,9 +56,11 @@ project_root = str(Path(__file__).parent.parent)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+import asyncio
 import logging
+import threading
 import time
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from fastapi import FastAPI, HTTPException, Request, Depends, status, Header
 from fastapi.responses import JSONResponse
@@ -72,8 +74,9 @@ from config import get_config, VIBE_DESCRIPTIONS
 from api.middleware.validation import setup_validation_middleware
 from llm_bridge.bridge import LLMBridge
 from api.authHandler import APIKeyAuth, verify_api_key
-from api.userHandler import create_user, get_user, verify_user, rotate_api_key
-from llm_bridge.cache_manager import LocalCacheManager
+from api.userHandler import create_user, get_user, verify_user, rotate_api_key, create_access_token, verify_token
+from api._auth_ctx import pwd_context, verify_dummy_password, run_in_hash_pool
+from data_layer.mongoHandler import get_db_handler, get_async_db_handler, close_async_db_handler
 
 # Get configuration
 config = get_config()
@@ -85,22 +88,89 @@ app = FastAPI(
     version=config["api"]["version"]
 )
 
-# Initialize LLM Bridge
-llm_bridge = LLMBridge(config=config)
+# LLM Bridge, built at startup off the event loop so importing the API doesn't
+# connect to MongoDB or load models
+llm_bridge = None
+_llm_bridge_lock = threading.Lock()
+
+def get_llm_bridge() -> LLMBridge:
+    """Return the shared LLM bridge, creating it on the first call (blocking; call from a worker thread)."""
+    global llm_bridge
+    if llm_bridge is None:
+        with _llm_bridge_lock:
+            if llm_bridge is None:
+                llm_bridge = LLMBridge(config=config)
+    return llm_bridge
+
+async def _get_llm_bridge_async() -> LLMBridge:
+    """get_llm_bridge for coroutines: a cold build runs in a worker thread, not on the event loop."""
+    if llm_bridge is not None:
+        return llm_bridge
+    return await asyncio.to_thread(get_llm_bridge)
 
-# Initialize cache manager
-cache_manager = LocalCacheManager()
+@app.on_event("startup")
+async def build_llm_bridge():
+    # Load the embedding model and connect to MongoDB before serving, without blocking the loop
+    try:
+        await asyncio.to_thread(get_llm_bridge)
+        logging.info("✅ LLM bridge initialized")
+    except Exception as e:
+        logging.warning(f"❌ LLM bridge initialization failed, retrying on first request: {e}")
 
 @app.on_event("startup")
-def clear_cache_on_startup():
+async def clear_cache_on_startup():
     # Enable cache clearing on startup via environment variable
     if os.getenv("CLEAR_CACHE_ON_STARTUP", "false").lower() == "true":
-        success = cache_manager.clear_cache()
+        bridge = await _get_llm_bridge_async()
+        success = await asyncio.to_thread(bridge.cache_manager.clear_cache)
         if success:
             logging.info("✅ Cache cleared on API startup")
         else:
             logging.warning("❌ Failed to clear cache on API startup")
 
+@app.on_event("startup")
+async def warm_up_auth():
+    # Load the password hashing backends and exercise the token path once so the
+    # first real login doesn't pay for the lazy initialization
+    try:
+        pwd_context.handler("bcrypt").get_backend()
+        await run_in_hash_pool(verify_dummy_password, "warmup")  # also computes the dummy hash
+        verify_token(create_access_token({"sub": "_warmup"}, timedelta(seconds=5)))
+        logging.info("✅ Auth warm-up completed")
+    except Exception as e:
+        logging.warning(f"❌ Auth warm-up failed: {e}")
+
+@app.on_event("startup")
+async def ensure_user_indexes():
+    # The async handler's create_user relies on the unique user indexes for duplicates
+    try:
+        await get_async_db_handler().ensure_indexes()
+    except Exception as e:
+        logging.warning(f"❌ Failed to ensure user indexes: {e}")
+
+@app.on_event("shutdown")
+def close_async_db():
+    close_async_db_handler()
+
+@app.on_event("startup")
+async def migrate_qa_records():
+    # Bring legacy QA records up to date in the background: question hashes let exact-match
+    # lookups drop the text fallback, unit-length + int8 embeddings serve semantic search.
+    # Both are no-ops once every record has been migrated.
+    def _run():
+        try:
+            db = get_db_handler()
+        except Exception as e:
+            logging.warning(f"❌ QA record migrations skipped, MongoDB unavailable: {e}")
+            return
+        for migration in (db.backfill_question_hashes, db.normalize_stored_embeddings):
+            try:
+                migration()
+            except Exception as e:
+                logging.warning(f"❌ QA record migration {migration.__name__} failed: {e}")
+    
+    asyncio.get_running_loop().run_in_executor(None, _run)
+
 # Add middleware
 setup_validation_middleware(app)
 
@@ -136,7 +206,7 @@ async def health_check():
             
         return {
             "status": "healthy",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "version": config["api"]["version"],
             "components": {
                 "database": db_status,
@@ -406,7 +476,7 @@ async def register_user(user_data: UserCreate):
             "username": created_user.get("username"),
             "email": created_user.get("email"),
             "api_key": created_user.get("api_key"),
-            "created_at": created_user.get("created_at", datetime.utcnow())
+            "created_at": created_user.get("created_at", datetime.now(timezone.utc))
         }
         
     except HTTPException:
@@ -451,6 +521,30 @@ async def login_user(login_data: UserLogin):
             detail="An error occurred during login"
         )
 
+# --- Helpers for the /ask-llm/ endpoint ---
+def _bridge_payload(request: LLMRequest) -> Dict[str, Any]:
+    """Build the LLM bridge payload for an incoming question."""
+    return {
+        "prompt": request.question,
+        "vibe": request.vibe,
+        "response_preference": request.nature_of_answer.lower(),
+        "show_confidence": request.confidence,
+        "sender_id": request.sender_id,
+        "question_id": request.question_id
+    }
+
+def _model_metadata(response: Dict[str, Any], entity: Dict[str, Any]) -> Dict[str, Any]:
+    """Get model metadata from a bridge response, filling in the required defaults."""
+    model_metadata = response.get('model_metadata', {})
+    if not isinstance(model_metadata, dict):
+        model_metadata = {}
+        
+    # Ensure required metadata fields are set
+    model_metadata.setdefault('llm_used', response.get('llm_used', 'unknown'))
+    model_metadata.setdefault('from_cache', response.get('from_cache', False))
+    model_metadata.setdefault('is_guest', entity.get('is_guest', False))
+    return model_metadata
+
 # --- POST endpoint: /ask-llm/ ---
 @app.post("/ask-llm/", response_model=LLMResponse)
 async def ask_llm(
@@ -472,30 +566,16 @@ async def ask_llm(
         logging.info(f"Processing question from {entity.get('id')}: {request.question}")
         
         # Prepare the request payload for the LLM bridge
-        request_payload = {
-            "prompt": request.question,
-            "vibe": request.vibe,
-            "response_preference": request.nature_of_answer.lower(),
-            "show_confidence": request.confidence,
-            "sender_id": request.sender_id,
-            "question_id": request.question_id
-        }
+        request_payload = _bridge_payload(request)
         
         # Process the request through the LLM bridge
-        response = llm_bridge.process_request(request_payload)
+        bridge = await _get_llm_bridge_async()
+        response = bridge.process_request(request_payload)
         
         # Log the response
         logging.info(f"Response from LLM bridge: {response}")
         
-        # Get model metadata from response or use defaults
-        model_metadata = response.get('model_metadata', {})
-        if not isinstance(model_metadata, dict):
-            model_metadata = {}
-            
-        # Ensure required metadata fields are set
-        model_metadata.setdefault('llm_used', response.get('llm_used', 'unknown'))
-        model_metadata.setdefault('from_cache', response.get('from_cache', False))
-        model_metadata.setdefault('is_guest', entity.get('is_guest', False))
+        model_metadata = _model_metadata(response, entity)
         
         # Return the response
         return LLMResponse(
@@ -541,7 +621,7 @@ async def test_mongodb():
     """Test MongoDB connection and access."""
     try:
         # Test the connection
-        db_handler.test_connection()
+        await asyncio.to_thread(get_db_handler().test_connection)
         return {"status": "success", "message": "MongoDB connection test passed!"}
     except Exception as e:
         logger.error(f"MongoDB test failed: {str(e)}")
@@ -0,0 +1,112 @@
+"""
+Behavior tests for the in-memory semantic search index and int8 embedding storage.
+"""
+import numpy as np
+import pytest
+
+from data_layer.mongoHandler import (
+    _EmbeddingIndex,
+    _unit_vector,
+    _quantize_embedding,
+    _stored_embedding,
+    EMBEDDING_I8_SCALE,
+)
+
+def _build_index(vectors, vibes=None, natures=None):
+    """Load vectors into a fresh index with record ids id0, id1, ..."""
+    index = _EmbeddingIndex()
+    index.reset()
+    count = len(vectors)
+    index.extend(
+        [f"id{i}" for i in range(count)],
+        np.stack([_unit_vector(vector) for vector in vectors]),
+        vibes or ["fun"] * count,
+        natures or ["Short"] * count
+    )
+    return index
+
+def _graded_vectors(query, count, seed=0):
+    """Unit vectors whose similarity to query falls in clear 0.05 steps (0.95, 0.90, ...)."""
+    rng = np.random.default_rng(seed)
+    vectors = []
+    for i in range(count):
+        noise = rng.standard_normal(query.shape).astype(np.float32)
+        noise -= noise.dot(query) * query  # orthogonal to the query
+        noise /= np.linalg.norm(noise)
+        similarity = 0.95 - 0.05 * i
+        vectors.append(similarity * query + np.sqrt(1 - similarity ** 2) * noise)
+    return vectors
+
+QUERY = _unit_vector([1.0, 0.0, 0.0])
+VECTORS = [
+    [1.0, 0.0, 0.0],   # id0: 1.00
+    [1.0, 1.0, 0.0],   # id1: 0.71
+    [1.0, 0.2, 0.0],   # id2: 0.98
+    [0.0, 1.0, 0.0],   # id3: 0.00
+]
+
+def test_search_returns_top_k_best_first():
+    """The k most similar rows come back in descending order of similarity."""
+    index = _build_index(VECTORS)
+
+    results = index.search(QUERY, None, None, threshold=0.5, top_k=2)
+
+    assert [record_id for record_id, _ in results] == ["id0", "id2"]
+    assert results[0][1] == pytest.approx(1.0, abs=1e-6)
+    assert results[0][1] > results[1][1]
+
+def test_search_applies_similarity_threshold():
+    """Rows below the threshold are left out even when top_k has room for them."""
+    index = _build_index(VECTORS)
+
+    results = index.search(QUERY, None, None, threshold=0.5, top_k=10)
+    assert [record_id for record_id, _ in results] == ["id0", "id2", "id1"]
+
+    assert index.search(_unit_vector([0.0, 0.0, 1.0]), None, None, threshold=0.5, top_k=10) == []
+
+def test_search_filters_by_labels():
+    """vibe / nature_of_answer narrow the candidates; an unknown label matches nothing."""
+    index = _build_index(
+        VECTORS,
+        vibes=["fun", "serious", "fun", "fun"],
+        natures=["Short", "Short", "Detailed", "Short"]
+    )
+
+    results = index.search(QUERY, "fun", "Detailed", threshold=0.0, top_k=10)
+    assert [record_id for record_id, _ in results] == ["id2"]
+
+    assert index.search(QUERY, "sarcastic", None, threshold=0.0, top_k=10) == []
+
+def test_extend_grows_past_initial_capacity():
+    """Appending beyond the preallocated rows keeps earlier rows searchable."""
+    index = _build_index(VECTORS)
+    filler = np.tile(_unit_vector([0.0, 0.0, 1.0]), (2000, 1))
+    index.extend([f"fill{i}" for i in range(2000)], filler, ["fun"] * 2000, ["Short"] * 2000)
+
+    assert index.size == 2004
+    results = index.search(QUERY, None, None, threshold=0.5, top_k=1)
+    assert results[0][0] == "id0"
+
+def test_int8_round_trip_error_is_bounded():
+    """Dequantized components stay within half a quantization step of the original."""
+    vector = _graded_vectors(_unit_vector(np.ones(384)), 1)[0]
+
+    restored = _stored_embedding(bytes(_quantize_embedding(vector)))
+
+    assert restored.dtype == np.float32
+    assert np.max(np.abs(restored - vector)) <= EMBEDDING_I8_SCALE / 2 + 1e-6
+
+def test_int8_round_trip_keeps_ranking():
+    """An index built from int8-stored embeddings ranks rows as the float index does."""
+    rng = np.random.default_rng(42)
+    query = _unit_vector(rng.standard_normal(384))
+    vectors = _graded_vectors(query, 10)
+
+    float_index = _build_index(vectors)
+    int8_index = _build_index([_stored_embedding(bytes(_quantize_embedding(v))) for v in vectors])
+
+    float_ids = [record_id for record_id, _ in float_index.search(query, None, None, 0.3, 10)]
+    int8_ids = [record_id for record_id, _ in int8_index.search(query, None, None, 0.3, 10)]
+
+    assert float_ids == [f"id{i}" for i in range(len(float_ids))]
+    assert int8_ids == float_ids
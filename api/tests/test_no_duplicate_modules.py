@@ -0,0 +1,21 @@
+"""
+Guard against duplicate copies of the API handler modules.
+"""
+import importlib.util
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+SKIP_DIRS = {".git", ".venv", "venv", "build", "dist", "__pycache__"}
+
+def test_single_user_handler_module():
+    """Only one userHandler.py exists, and it is the one api.userHandler resolves to."""
+    spec = importlib.util.find_spec("api.userHandler")
+    assert spec is not None and spec.origin, "api.userHandler should be importable"
+    
+    copies = [
+        path.resolve()
+        for path in PROJECT_ROOT.rglob("userHandler.py")
+        if not SKIP_DIRS.intersection(path.relative_to(PROJECT_ROOT).parts)
+    ]
+    
+    assert copies == [Path(spec.origin).resolve()], f"Duplicate userHandler modules found: {copies}"
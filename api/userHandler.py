@@ -14,32 +14,47 @@ Key Features:
 Dependencies:
     fastapi: Web framework for building APIs
     passlib: Password hashing library
-    python-jose: JWT token handling
+    orjson: JSON encoding/decoding for JWT segments
     pymongo: MongoDB database interface
     python-dotenv: Environment variable management
 """
 
 import os
+import time
+import hmac
+import base64
+import hashlib
 import logging
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
-import jwt
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import orjson
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
+from bson import ObjectId
 from dotenv import load_dotenv
-import uuid
+import secrets
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Import from our consolidated mongoHandler
-from data_layer.mongoHandler import db_handler
+from data_layer.mongoHandler import get_async_db_handler
+from api._auth_ctx import pwd_context, verify_and_update_password, verify_dummy_password, run_in_hash_pool
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application entry point
 logger = logging.getLogger(__name__)
 
+def _log_error(message: str, *args: Any) -> None:
+    """
+    Log an error from an except block with lazy %-formatting.
+    
+    The traceback is only formatted when DEBUG is enabled, and nothing is
+    formatted at all when ERROR records would be dropped.
+    """
+    if logger.isEnabledFor(logging.ERROR):
+        logger.error(message, *args, exc_info=logger.isEnabledFor(logging.DEBUG))
+
 # JWT Configuration - Load from environment variables with fallback
 SECRET_KEY = os.getenv("JWT_SECRET", "your-secret-key-here")
 if SECRET_KEY == "your-secret-key-here":
@@ -48,14 +63,51 @@ if SECRET_KEY == "your-secret-key-here":
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Default token lifetime in seconds ("exp" is stored as integer epoch seconds)
+_DEFAULT_TOKEN_TTL = 15 * 60
+
+# Encode the signing key and the fixed HS256 header once instead of on every call
+_SECRET_KEY_BYTES = SECRET_KEY.encode("utf-8")
+_HEADER_B64 = base64.urlsafe_b64encode(orjson.dumps({"alg": ALGORITHM, "typ": "JWT"})).rstrip(b"=")
+
+# Verified token payloads keyed by a digest of the token: digest -> (payload, valid_until).
+# Rejected tokens are cached briefly with a None payload so repeated bad tokens skip the HMAC too.
+_TOKEN_CACHE: "OrderedDict[bytes, Tuple[Optional[Dict[str, Any]], float]]" = OrderedDict()
+_TOKEN_CACHE_MAX = 8192
+_INVALID_TOKEN_TTL = 1.0  # seconds
+
+def _credentials_error() -> HTTPException:
+    """Build the 401 raised by the token checks; a new instance per failure, so no request state is shared."""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-# Password hashing configuration
-pwd_context = CryptContext(
-    schemes=["bcrypt"],  # Using bcrypt for secure password hashing
-    deprecated="auto"    # Automatically handle deprecated hashes
-)
+# Projections for user lookups - only fetch the fields each code path reads
+LOGIN_PROJECTION = {
+    "_id": 1,
+    "username": 1,
+    "email": 1,
+    "hashed_password": 1,
+    "api_key": 1,
+    "created_at": 1
+}
+# Shaped server-side: _id is returned as the string "id", so no dict rebuild in Python
+USER_PROJECTION = {
+    "_id": 0,
+    "id": {"$toString": "$_id"},
+    "username": 1,
+    "email": 1,
+    "api_key": 1,
+    "user_type": 1,
+    "is_active": 1,
+    "created_at": 1,
+    "last_login": 1
+}
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -78,13 +130,56 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         True
     """
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    ttl = int(expires_delta.total_seconds()) if expires_delta else _DEFAULT_TOKEN_TTL
+    to_encode["exp"] = int(time.time()) + ttl
+    
+    payload_b64 = base64.urlsafe_b64encode(orjson.dumps(to_encode)).rstrip(b"=")
+    signing_input = _HEADER_B64 + b"." + payload_b64
+    signature = _sign(signing_input)
+    return (signing_input + b"." + signature).decode("ascii")
+
+def _sign(signing_input: bytes) -> bytes:
+    """Compute the base64url-encoded HS256 signature of a JWT signing input."""
+    digest = hmac.new(_SECRET_KEY_BYTES, signing_input, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=")
+
+def _b64url_decode(segment: bytes) -> bytes:
+    """Decode an unpadded base64url JWT segment."""
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+def _decode_hs256(token: str, now: float) -> Dict[str, Any]:
+    """
+    Verify an HS256 token's signature and expiry and return its payload.
+    
+    Raises:
+        ValueError: If the token is malformed, has a bad signature, or is expired
+    """
+    raw = token.encode("ascii")
+    if raw.count(b".") != 2:
+        raise ValueError("Malformed token")
+    signing_input, _, signature = raw.rpartition(b".")
+    header_b64, _, payload_b64 = signing_input.partition(b".")
+    if not header_b64 or not payload_b64:
+        raise ValueError("Malformed token")
+    
+    # Tokens we issue always carry the same header; anything else must still be HS256
+    if header_b64 != _HEADER_B64:
+        header = orjson.loads(_b64url_decode(header_b64))
+        if not isinstance(header, dict) or header.get("alg") != ALGORITHM:
+            raise ValueError("Unsupported token algorithm")
+    
+    if not hmac.compare_digest(_sign(signing_input), signature):
+        raise ValueError("Invalid token signature")
+    
+    payload = orjson.loads(_b64url_decode(payload_b64))
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid token payload")
+    
+    exp = payload.get("exp")
+    if not isinstance(exp, (int, float)) or exp <= now:
+        raise ValueError("Token expired")
+    
+    return payload
 
 def verify_token(token: str) -> Dict[str, Any]:
     """
@@ -101,19 +196,45 @@ def verify_token(token: str) -> Dict[str, Any]:
     Raises:
         HTTPException: If token is invalid or expired
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    cache_key = _token_cache_key(token)
+    now = time.time()
+    
+    cached = _TOKEN_CACHE.get(cache_key)
+    if cached is not None:
+        payload, valid_until = cached
+        if valid_until > now:
+            _TOKEN_CACHE.move_to_end(cache_key)
+            if payload is None:
+                raise _credentials_error() from None
+            # A copy per caller, so one request's changes never reach the cached payload
+            return dict(payload)
+        _TOKEN_CACHE.pop(cache_key, None)
+    
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        return payload
-    except jwt.PyJWTError:
-        raise credentials_exception
+        payload = _decode_hs256(token, now)
+    except (ValueError, TypeError):
+        _cache_token(cache_key, None, now + _INVALID_TOKEN_TTL)
+        raise _credentials_error() from None
+    
+    username: str = payload.get("sub")
+    if username is None:
+        _cache_token(cache_key, None, now + _INVALID_TOKEN_TTL)
+        raise _credentials_error() from None
+    
+    # Cached only until the token's own expiry
+    _cache_token(cache_key, payload, float(payload["exp"]))
+    return dict(payload)
+
+def _token_cache_key(token: str) -> bytes:
+    """Digest a token into its key in the verification cache."""
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+def _cache_token(cache_key: bytes, payload: Optional[Dict[str, Any]], valid_until: float) -> None:
+    """Store a verification result in the token cache, evicting the least recently used entry."""
+    _TOKEN_CACHE[cache_key] = (payload, valid_until)
+    _TOKEN_CACHE.move_to_end(cache_key)
+    if len(_TOKEN_CACHE) > _TOKEN_CACHE_MAX:
+        _TOKEN_CACHE.popitem(last=False)
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
     """
@@ -130,20 +251,15 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any
     Raises:
         HTTPException: If authentication fails
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
     try:
         payload = verify_token(token)
         username: str = payload.get("sub")
         if username is None:
-            raise credentials_exception
+            raise _credentials_error() from None
         return {"username": username}
     except Exception as e:
-        logger.error(f"Error getting current user: {e}")
-        raise credentials_exception
+        logger.error("Error getting current user: %s", e)
+        raise _credentials_error() from None
 
 async def create_user(username: str, email: str, password: str, user_type: str = "user") -> Dict[str, Any]:
     """
@@ -173,8 +289,8 @@ async def create_user(username: str, email: str, password: str, user_type: str =
         True
     """
     try:
-        # Use the MongoDBHandler's create_user method
-        user = db_handler.create_user(username, email, password, user_type)
+        # The async handler hashes on the hashing pool and awaits the insert
+        user = await get_async_db_handler().create_user(username, email, password, user_type)
         
         return {
             "success": True,
@@ -191,12 +307,36 @@ async def create_user(username: str, email: str, password: str, user_type: str =
     except ValueError as e:
         return {"success": False, "error": str(e)}
     except Exception as e:
-        logger.error(f"Error creating user: {str(e)}", exc_info=True)
+        _log_error("Error creating user: %s", e)
         return {
             "success": False, 
             "error": f"Failed to create user: {str(e)}"
         }
 
+async def _find_by_username_or_email(identifier: str, projection: Dict[str, int]) -> Optional[Dict[str, Any]]:
+    """
+    Look up a user by username or email with single-field equality queries.
+    
+    Identifiers containing '@' are tried as an email first and only then as a
+    username; anything else can only be a username. Each query hits one unique
+    index instead of making the planner union two branches of an $or.
+    
+    Args:
+        identifier (str): Username or email address
+        projection (Dict[str, int]): Fields to return
+        
+    Returns:
+        Optional[Dict[str, Any]]: The user document if found, None otherwise
+    """
+    if "@" not in identifier:
+        return await get_async_db_handler().users.find_one({"username": identifier}, projection=projection)
+    
+    user_doc = await get_async_db_handler().users.find_one({"email": identifier}, projection=projection)
+    if user_doc is None:
+        # Rare, but usernames may contain '@' as well
+        user_doc = await get_async_db_handler().users.find_one({"username": identifier}, projection=projection)
+    return user_doc
+
 async def verify_user(username: str, password: str) -> Dict[str, Any]:
     """
     Verify user credentials and return user data if valid.
@@ -215,27 +355,28 @@ async def verify_user(username: str, password: str) -> Dict[str, Any]:
             - error (str, optional): Error message if unsuccessful
     """
     try:
-        # Try to find user by username or email
-        user_doc = db_handler.users.find_one({
-            "$or": [
-                {"username": username},
-                {"email": username}
-            ]
-        })
+        # Try to find user by username or email, fetching only the fields used below
+        user_doc = await _find_by_username_or_email(username, LOGIN_PROJECTION)
         
         if not user_doc:
+            # Spend the same hashing time as a wrong password so usernames can't be probed by timing
+            await run_in_hash_pool(verify_dummy_password, password)
             return {"success": False, "error": "Invalid username or password"}
             
-        # Verify password using bcrypt
-        from passlib.hash import bcrypt
-        if not bcrypt.verify(password, user_doc.get("hashed_password")):
+        # Verify password on the hashing pool so the KDF doesn't block the event loop
+        verified, new_hash = await run_in_hash_pool(
+            verify_and_update_password, password, user_doc.get("hashed_password")
+        )
+        if not verified:
             return {"success": False, "error": "Invalid username or password"}
         
-        # Update last login time
-        db_handler.update_user(
-            str(user_doc["_id"]),
-            {"last_login": datetime.utcnow()}
-        )
+        # Update last login time (and upgrade legacy bcrypt hashes to argon2)
+        # Written directly against the fetched _id with an unacknowledged write
+        # concern so the login doesn't wait for a second round-trip
+        update_data = {"last_login": datetime.now(timezone.utc)}
+        if new_hash:
+            update_data["hashed_password"] = new_hash
+        await get_async_db_handler().update_user_unacked(user_doc["_id"], update_data)
         
         # Return user data without sensitive information
         return {
@@ -250,7 +391,7 @@ async def verify_user(username: str, password: str) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        logger.error(f"Error verifying user: {str(e)}", exc_info=True)
+        _log_error("Error verifying user: %s", e)
         return {
             "success": False, 
             "error": "An error occurred during authentication"
@@ -269,33 +410,20 @@ async def get_user(identifier: str) -> Optional[Dict[str, Any]]:
         Optional[Dict[str, Any]]: User document if found, None otherwise
     """
     try:
-        from bson import ObjectId
-        
-        # Try to find by ObjectId first
-        try:
-            user = db_handler.get_user(identifier)
+        # Try to find by ObjectId first; both lookups return the USER_PROJECTION shape
+        if ObjectId.is_valid(identifier):
+            user = await get_async_db_handler().users.find_one(
+                {"_id": ObjectId(identifier), "is_active": True},
+                projection=USER_PROJECTION
+            )
             if user:
                 return user
-        except:
-            pass  # Not a valid ObjectId, try username/email
             
-        # Try to find by username or email
-        user_doc = db_handler.users.find_one({
-            "$or": [
-                {"username": identifier},
-                {"email": identifier}
-            ]
-        })
-        
-        if user_doc:
-            # Convert ObjectId to string for JSON serialization
-            user_doc["id"] = str(user_doc.pop("_id"))
-            return user_doc
-            
-        return None
+        # Try to find by username or email (never returns the password hash)
+        return await _find_by_username_or_email(identifier, USER_PROJECTION)
         
     except Exception as e:
-        logger.error(f"Error getting user {identifier}: {str(e)}", exc_info=True)
+        _log_error("Error getting user %s: %s", identifier, e)
         return None
 
 async def rotate_api_key(user_id: str) -> Dict[str, Any]:
@@ -316,10 +444,10 @@ async def rotate_api_key(user_id: str) -> Dict[str, Any]:
     """
     try:
         # Generate a new API key
-        new_api_key = str(uuid.uuid4())
+        new_api_key = secrets.token_urlsafe(16)
         
         # Update the user's API key in the database
-        result = db_handler.update_user(
+        result = await get_async_db_handler().update_user(
             user_id,
             {"api_key": new_api_key}
         )
@@ -336,7 +464,7 @@ async def rotate_api_key(user_id: str) -> Dict[str, Any]:
             }
             
     except Exception as e:
-        logger.error(f"Error rotating API key for user {user_id}: {str(e)}", exc_info=True)
+        _log_error("Error rotating API key for user %s: %s", user_id, e)
         return {
             "success": False,
             "error": "An error occurred while rotating the API key"
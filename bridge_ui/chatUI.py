@@ -20,45 +20,83 @@ Dependencies:
     datetime: Timestamp handling
     uuid: Unique ID generation
     re: Regular expressions for text processing
-    asyncio: Asynchronous operations
 """
 
-import os
 import uuid
+import logging
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 from datetime import datetime
-import time
-import asyncio
-from streamlit.runtime.scriptrunner import add_script_run_ctx
 import re
 
+logger = logging.getLogger(__name__)
+
 # Base URL for the BRIDGE API
 API_BASE_URL = "http://localhost:8000"
 
+# Number of chat messages rendered at a time; "Load earlier" adds another window
+HISTORY_WINDOW = 50
+
+# Shared HTTP session so repeated calls reuse a keep-alive connection to the API
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4, pool_block=False))
+
+# Single-pass translation table for escape_html
+_HTML_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+# Code formatting patterns, compiled once at import
+_CODE_FENCE = '```'
+_CODE_LANG_RE = re.compile(r'[\w\-+]*\n')
+_INLINE_CODE_RE = re.compile(r'(?<!`)`([^`\n]+?)`(?!`)')
+# Confidence tag at the end of an answer, e.g. "[CONFIDENCE: 0.85]" (the CONFIDITY misspelling is accepted too)
+_CONFIDENCE_TAG_RE = re.compile(r'\[CONFID(?:ENCE|ITY):\s*([0-9]*\.?[0-9]+)\s*\]?')
+
+
+# Message HTML templates, filled with str.format
+_USER_TPL = (
+    '<div class="chat-message user-message">'
+    '<div class="message-content">{content}</div>'
+    '<div class="message-time">{ts}</div>'
+    '</div>'
+)
+_AI_TPL = (
+    '<div class="chat-message ai-message">'
+    '<div class="message-header"><div class="model-info">'
+    '<span class="model-name">{model}</span>'
+    '<span class="confidence-score">{confidence}</span>'
+    '{extras}'
+    '</div></div>'
+    '<div class="message-content">{content}</div>'
+    '<div class="message-time">{ts}</div>'
+    '</div>'
+)
+_VIBE_TPL = '<span class="vibe-display">• Style: {}</span>'
+_NATURE_TPL = '<span class="nature-display">• Length: {}</span>'
+
+@st.cache_data
+def _read_css() -> str:
+    """Read the chat stylesheet once per process; later reruns reuse the cached string."""
+    return (Path(__file__).parent / "static" / "styles.css").read_text(encoding="utf-8")
+
 def load_css():
     """
     Load and inject custom CSS styles for the chat interface.
     
-    This function locates and loads the CSS file from the project's static directory.
-    The CSS file is expected to be at: /ui/static/styles.css relative to the project root.
+    The stylesheet is read from static/styles.css next to this module. The file
+    contents are cached by _read_css, so reruns only re-inject the cached string.
     
     The function includes error handling for file operations and logs any issues.
     """
-    print("✅ CSS loaded!")
-    # Navigate to the project root and then to the UI static directory
-    css_file = Path(__file__).parent / "static" / "styles.css"
-    print(f"Loading CSS from: {css_file}") 
     try:
-        with open(css_file) as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-    except FileNotFoundError:
-        st.error(f"CSS file not found at: {css_file}")
-        print(f"Error: CSS file not found at: {css_file}")
+        st.markdown(f"<style>{_read_css()}</style>", unsafe_allow_html=True)
+    except FileNotFoundError as e:
+        st.error(f"CSS file not found at: {e.filename}")
+        logger.error("CSS file not found at: %s", e.filename)
     except Exception as e:
         st.error(f"Error loading CSS: {str(e)}")
-        print(f"Error loading CSS: {str(e)}")
+        logger.error("Error loading CSS: %s", e)
 
 def escape_html(text):
     """
@@ -70,11 +108,7 @@ def escape_html(text):
     Returns:
         str: Escaped text with HTML special characters converted to entities
     """
-    return (str(text)
-            .replace('&', '&amp;')
-            .replace('<', '&lt;')
-            .replace('>', '&gt;')
-            .replace('"', '&quot;'))
+    return str(text).translate(_HTML_ESCAPE_TABLE)
 
 def format_code_blocks(text):
     """
@@ -94,30 +128,103 @@ def format_code_blocks(text):
         text = str(text)
 
     # Process code blocks (```...```)
-    def block_replacer(match):
-        code = match.group(1).strip()
-        return (
-            '<div class="code-block"><pre><code>'
-            + escape_html(code)
-            + '</code></pre></div>'
-        )
-
-    text = re.sub(
-        r'```(?:[\w\-+]*\n)?(.*?)```',
-        block_replacer,
-        text,
-        flags=re.DOTALL
-    )
+    parts = []
+    pos = 0
+    for start, end, code in _find_code_blocks(text):
+        parts.append(text[pos:start])
+        parts.append(_code_block_html(code))
+        pos = end
+    if parts:
+        parts.append(text[pos:])
+        text = "".join(parts)
 
     # Process inline code (`...`)
-    text = re.sub(
-        r'(?<!`)`([^`\n]+?)`(?!`)',
-        r'<code>\1</code>',
-        text
-    )
+    text = _INLINE_CODE_RE.sub(r'<code>\1</code>', text)
 
     return text
 
+def _find_code_blocks(text):
+    """
+    Locate ```...``` code blocks with a single forward scan.
+    
+    An optional language tag line after the opening fence is skipped. An opening
+    fence without a closing one is left as plain text. Each fence is found with
+    str.find, so malformed model output cannot make the scan quadratic.
+    
+    Yields:
+        tuple: (start, end, code) where text[start:end] is the whole fenced block
+    """
+    pos = 0
+    while True:
+        start = text.find(_CODE_FENCE, pos)
+        if start == -1:
+            return
+        body = start + len(_CODE_FENCE)
+        lang = _CODE_LANG_RE.match(text, body)
+        if lang:
+            body = lang.end()
+        close = text.find(_CODE_FENCE, body)
+        if close == -1:
+            return
+        pos = close + len(_CODE_FENCE)
+        yield start, pos, text[body:close]
+
+def _code_block_html(code):
+    """Render the body of a ```...``` block as an escaped, pre-formatted code block."""
+    return (
+        '<div class="code-block"><pre><code>'
+        + escape_html(code.strip())
+        + '</code></pre></div>'
+    )
+
+def _prepare_request(question: str, vibe: str, nature_of_answer: str, confidence: bool):
+    """
+    Build the headers and payload for an /ask-llm/ call from session state.
+    
+    Returns:
+        tuple: (headers, payload), or (None, error_response) when the session is invalid
+    """
+    # Get values from session state with defaults
+    api_key = st.session_state.get('api_key', 'guest_key')
+    username = st.session_state.get('username', 'guest_user')
+    
+    logger.debug("Sending request to /ask-llm/ for user %s", username)
+    
+    # Prepare headers with the values from session state
+    headers = {
+        "Content-Type": "application/json",
+        "X-API-Key": str(api_key),
+        "X-Username": str(username)
+    }
+    
+    # For logged-in users, ensure we have a valid API key
+    if not st.session_state.get('is_guest', True) and (not api_key or api_key == 'guest_key'):
+        logger.warning("Invalid session - no API key for logged-in user %s", username)
+        return None, {"response": "Error: Invalid session. Please log in again."}
+    
+    payload = {
+        "vibe": vibe,
+        "sender_id": username,
+        "question_id": str(uuid.uuid4()),
+        "question": question,
+        "confidence": confidence,
+        "nature_of_answer": nature_of_answer
+    }
+    logger.debug("Payload: %s", payload)
+    return headers, payload
+
+def _handle_response(response) -> dict:
+    """Turn an /ask-llm/ HTTP response into the UI's response dict."""
+    logger.debug("Status Code: %s", response.status_code)
+    # response.text decodes the whole body, so only touch it when it will be logged
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Response: %s", response.text)
+    
+    if response.status_code == 200:
+        return response.json()
+    logger.error("Error response: %s - %s", response.status_code, response.text)
+    return {"response": f"Error: {response.status_code} - {response.text}"}
+
 def send_message(question: str, vibe: str, nature_of_answer: str, confidence: bool = True) -> dict:
     """
     Send a message to the LLM API and return the response.
@@ -132,61 +239,112 @@ def send_message(question: str, vibe: str, nature_of_answer: str, confidence: bo
         dict: The response from the LLM API
     """
     try:
-        # Get values from session state with defaults
-        api_key = st.session_state.get('api_key', 'guest_key')
-        username = st.session_state.get('username', 'guest_user')
-        
-        # Debug log
-        print(f"\n=== Sending request to /ask-llm/ ===")
-        print(f"API Key: {api_key}")
-        print(f"Username: {username}")
-        
-        # Prepare headers with the values from session state
-        headers = {
-            "Content-Type": "application/json",
-            "X-API-Key": str(api_key),
-            "X-Username": str(username)
-        }
-        print(f"Headers: {headers}")
-        
-        # For logged-in users, ensure we have a valid API key
-        if not st.session_state.get('is_guest', True) and (not api_key or api_key == 'guest_key'):
-            print("Error: Invalid session - no API key for logged-in user")
-            return {"response": "Error: Invalid session. Please log in again."}
+        headers, payload = _prepare_request(question, vibe, nature_of_answer, confidence)
+        if headers is None:
+            return payload
         
-        payload = {
-            "vibe": vibe,
-            "sender_id": username,
-            "question_id": str(uuid.uuid4()),
-            "question": question,
-            "confidence": confidence,
-            "nature_of_answer": nature_of_answer
-        }
-        print(f"Payload: {payload}")
-        
-        response = requests.post(
+        response = _SESSION.post(
             f"{API_BASE_URL}/ask-llm/", 
             json=payload, 
             headers=headers,
             timeout=30
         )
-        
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {response.text}")
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Error response: {response.text}")
-            return {"response": f"Error: {response.status_code} - {response.text}"}
+        return _handle_response(response)
             
     except requests.exceptions.RequestException as e:
-        print(f"Connection error: {str(e)}")
+        logger.error("Connection error: %s", e)
         return {"response": f"Connection error: {str(e)}"}
     except Exception as e:
-        print(f"Exception in send_message: {str(e)}")
+        logger.error("Exception in send_message: %s", e)
         return {"response": f"An error occurred: {str(e)}"}
 
+def _message_extras(message):
+    """Return the optional style/length spans shown in an AI message header."""
+    extras = []
+    if message.get("vibe"):
+        extras.append(_VIBE_TPL.format(message["vibe"]))
+    if message.get("nature"):
+        extras.append(_NATURE_TPL.format(message["nature"]))
+    return "".join(extras)
+
+def _ai_display_fields(content, model_metadata):
+    """
+    Work out how an AI answer is labelled in the UI.
+    
+    Args:
+        content (str): The raw answer text, possibly ending in a confidence tag
+        model_metadata (dict): Metadata returned by the API for the answer
+        
+    Returns:
+        tuple: (model name, confidence display string, content without the confidence tag)
+    """
+    model_name = model_metadata.get("llm_used", "BRIDGE").upper()
+    
+    # Default to BRIDGE if model is unknown
+    if model_name.lower() == "unknown":
+        model_name = "BRIDGE"
+
+    # Extract confidence score from metadata or response text
+    confidence = model_metadata.get("confidence")
+    
+    # Check for a confidence tag in the response text and clean it up
+    match = _CONFIDENCE_TAG_RE.search(content)
+    if match:
+        confidence = float(match.group(1))
+        # Remove the confidence part from the content
+        content = content[:match.start()].strip()
+    
+    # Format confidence for display
+    confidence_display = ""
+    if confidence is not None:
+        try:
+            confidence = float(confidence)
+            if 0 <= confidence <= 1:
+                confidence_display = f"• {int(confidence * 100)}%"
+        except (ValueError, TypeError):
+            pass
+    
+    return model_name, confidence_display, content
+
+def _build_message_html(message):
+    """
+    Build the HTML block for a single chat message.
+    
+    Args:
+        message (dict): A chat_history entry
+        
+    Returns:
+        str: The message rendered as HTML
+    """
+    if message["role"] == "user":
+        # Format user message with proper escaping and code blocks
+        return _USER_TPL.format(
+            content=format_code_blocks(message["content"]),
+            ts=message.get("timestamp", "")
+        )
+
+    # Process AI response message; answers from _fetch_answer carry precomputed display fields
+    if "display_model_name" in message:
+        model_name = message["display_model_name"]
+        confidence_display = message.get("confidence_display", "")
+        content = message["content"]
+    else:
+        model_name, confidence_display, content = _ai_display_fields(
+            message["content"], message.get("model_metadata", {})
+        )
+    
+    return _AI_TPL.format(
+        model=model_name,
+        confidence=confidence_display,
+        extras=_message_extras(message),
+        content=format_code_blocks(content),
+        ts=message.get("timestamp", "")
+    )
+
+def _load_earlier_messages():
+    """Widen the rendered history by one more window (button callback)."""
+    st.session_state.history_window = st.session_state.get('history_window', HISTORY_WINDOW) + HISTORY_WINDOW
+
 def render_chat_messages():
     """
     Render the chat messages in the UI with appropriate styling.
@@ -196,100 +354,162 @@ def render_chat_messages():
     - Formatting code blocks and inline code
     - Displaying timestamps
     - Showing model information and confidence scores for AI responses
-    - Handling streaming vs. complete messages
     
     The function expects the following in st.session_state:
     - chat_history: List of message dictionaries with 'role', 'content', and 'timestamp' keys
     - For AI messages: 'model_metadata' with 'llm_used' and 'confidence' information
+    
+    Only the last 'history_window' messages (HISTORY_WINDOW by default) are shown,
+    with a button to load earlier ones, and they are emitted in a single st.markdown
+    call. The HTML of each message is cached on the message
+    dict under 'rendered_html'; drop that key if a message's content is ever changed.
     """
     if not st.session_state.get('chat_history'):
         st.markdown(''' ''', unsafe_allow_html=True)
         return
         
-    for message in st.session_state.chat_history:
-        if message["role"] == "user":
-            # Format user message with proper escaping and code blocks
-            content = format_code_blocks(message["content"])
-            st.markdown(f'''
-                <div class="chat-message user-message">
-                    <div class="message-content">{content}</div>
-                    <div class="message-time">{message.get("timestamp", "")}</div>
-                </div>
-            ''', unsafe_allow_html=True)
-        else:
-            # Process AI response message
-            model_metadata = message.get("model_metadata", {})
-            model_name = model_metadata.get("llm_used", "BRIDGE").upper()
-            
-            # Default to BRIDGE if model is unknown
-            if model_name.lower() == "unknown":
-                model_name = "BRIDGE"
+    # Only the most recent window of messages is rendered
+    history = st.session_state.chat_history
+    window = st.session_state.get('history_window', HISTORY_WINDOW)
+    if len(history) > window:
+        st.button("Load earlier messages", key="load_earlier", on_click=_load_earlier_messages)
+        history = history[-window:]
+        
+    parts = []
+    for message in history:
+        # Messages never change once added, so reuse the HTML built on an earlier rerun
+        rendered_html = message.get("rendered_html")
+        if rendered_html is None:
+            rendered_html = message["rendered_html"] = _build_message_html(message)
+        parts.append(rendered_html)
+    
+    # One markdown element for the whole history; the blank line between
+    # messages makes each one start a fresh HTML block
+    st.markdown("\n\n".join(parts), unsafe_allow_html=True)
 
-            # Extract confidence score from metadata or response text
-            confidence = model_metadata.get("confidence")
-            content = message["content"]
-            
-            # Check for confidence in response text and clean it up
-            confidence_tags = ["[CONFIDENCE:", "[CONFIDITY:"]
-            for tag in confidence_tags:
-                if tag in content:
-                    try:
-                        # Extract confidence value from the text
-                        confidence_part = content.split(tag)[1].split("]")[0]
-                        confidence = float(confidence_part.strip())
-                        # Remove the confidence part from the content
-                        content = content.split(tag)[0].strip()
-                        break  # Stop after first valid confidence tag is found
-                    except (IndexError, ValueError):
-                        continue
-            
-            # Format confidence for display
-            confidence_display = ""
-            if confidence is not None:
-                try:
-                    confidence = float(confidence)
-                    if 0 <= confidence <= 1:
-                        confidence_display = f"• {int(confidence * 100)}%"
-                except (ValueError, TypeError):
-                    pass
-            
-            content = format_code_blocks(content)
+def _fetch_answer(placeholder):
+    """
+    Ask the API about the latest user message and settle the answer into the chat history.
+    
+    Args:
+        placeholder: An st.empty() slot below the rendered chat history
+    
+    The question is shown in placeholder while the request is in flight, and the
+    answer is appended to st.session_state.chat_history.
+    """
+    last_message = st.session_state.chat_history[-1]
+    ai_message = {
+        "role": "ai",
+        "content": "",
+        "vibe": last_message["vibe"],
+        "nature": last_message["nature"],
+        "timestamp": datetime.now().strftime("%H:%M"),
+        "model_metadata": {}
+    }
+
+    # Show the question straight away; history is only re-rendered on the next run
+    placeholder.markdown(_build_message_html(last_message), unsafe_allow_html=True)
+    
+    response = send_message(
+        last_message["content"],
+        last_message["vibe"],
+        last_message["nature"],
+        confidence=True
+    )
+
+    # repr() of the full response is only worth paying for when it is logged
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Full response: %r", response)
+
+    if response and 'response' in response:
+        # Process the response...
+        model_metadata = response.get('model_metadata', {})
+
+        # Label the answer once here instead of on every render
+        model_name, confidence_display, answer = _ai_display_fields(
+            response['response'], model_metadata
+        )
+
+        # Add AI response to history
+        ai_response = answer
+
+        # Add follow-up questions if they exist
+        if 'follow_up_questions' in response and response['follow_up_questions']:
+            questions = response['follow_up_questions']
+            logger.debug("Processing %d follow-up questions", len(questions))
+            if isinstance(questions, list):
+                questions_html = "<br><br>" + "".join(f"<br>• {escape_html(q)}" for q in questions)
+                logger.debug("Questions HTML: %s", questions_html)
+                ai_response += questions_html
+
+        ai_message["content"] = ai_response
+        ai_message["model_metadata"] = model_metadata
+        ai_message["display_model_name"] = model_name
+        ai_message["confidence_display"] = confidence_display
+        st.session_state.chat_history.append(ai_message)
+
+@st.fragment
+def _input_form():
+    """
+    Render the message form and answer a submitted question.
+    
+    This runs as a Streamlit fragment, so a submit reruns only the form and the
+    pending-question slot above it instead of the whole page. Once the answer is settled,
+    st.rerun() refreshes the full page so the history picks up both messages.
+    """
+    with st.container():
+        # Slot for the question that is waiting for an answer
+        pending_placeholder = st.empty()
+        
+        with st.form(key=f'chat_form_{st.session_state.form_key}', clear_on_submit=True):
+            user_input = st.text_area(
+                "Your message",
+                label_visibility="collapsed",
+                placeholder="Let Bridge route your prompt...",
+                key=f"user_input_{st.session_state.form_key}",
+                height=60
+            )
+        
+            col1, col2, col3 = st.columns([3, 1, 1])
+            with col1:
+                vibe = st.selectbox(
+                    "Style",
+                    ["Business/Professional", "Academic/Research",
+                     "Technical/Development", "Daily/General", "Creative/Emotional"],
+                    key=f"vibe_{st.session_state.form_key}",
+                    label_visibility="collapsed"
+                )
+            with col2:
+                nature = st.selectbox(
+                    "Length",
+                    ["Short", "Medium", "Detailed"],
+                    key=f"nature_{st.session_state.form_key}",
+                    label_visibility="collapsed"
+                )
+            with col3:
+                submit_button = st.form_submit_button("Send", use_container_width=True, type="primary")
             
-            # Handle streaming vs. complete messages
-            if message.get("is_streaming"):
-                # Show typing indicator for streaming responses
-                st.markdown(f'''
-                    <div class="chat-message ai-message">
-                        <div class="message-header">
-                            <div class="model-info">
-                                <span class="model-name">{model_name}</span>
-                                <span class="confidence-score">{confidence_display}</span>
-                                {f'<span class="vibe-display">• Style: {message.get("vibe")}</span>' if message.get("vibe") else ''}
-                                {f'<span class="nature-display">• Length: {message.get("nature")}</span>' if message.get("nature") else ''}
-                            </div>                          
-                        </div>
-                        <div class="message-content">
-                            {content}<span style="animation: blink 1s infinite; color: #666;">▌</span>
-                        </div>
-                        <div class="message-time">{message.get("timestamp", "")}</div>
-                    </div>
-                ''', unsafe_allow_html=True)
-            else:
-                # Show complete response
-                st.markdown(f'''
-                    <div class="chat-message ai-message">
-                        <div class="message-header">
-                            <div class="model-info">
-                                <span class="model-name">{model_name}</span>
-                                <span class="confidence-score">{confidence_display}</span>
-                                {f'<span class="vibe-display">• Style: {message.get("vibe")}</span>' if message.get("vibe") else ''}
-                                {f'<span class="nature-display">• Length: {message.get("nature")}</span>' if message.get("nature") else ''}
-                            </div>                          
-                        </div>
-                        <div class="message-content">{content}</div>
-                        <div class="message-time">{message.get("timestamp", "")}</div>
-                    </div>
-                ''', unsafe_allow_html=True)
+            submitted = bool(submit_button and user_input.strip())
+            if submitted:
+                # Add user message to chat history
+                st.session_state.chat_history.append({
+                    "role": "user", 
+                    "content": user_input,
+                    "vibe": vibe,
+                    "nature": nature,
+                    "timestamp": datetime.now().strftime("%H:%M")
+                })
+
+    # Answer a just-submitted question within this same script run
+    if submitted:
+        try:
+            with st.spinner('Bridge is routing your request...'):
+                _fetch_answer(pending_placeholder)
+        except Exception as e:
+            st.error(f"Error getting response: {str(e)}")
+        else:
+            # Settle the new messages into the memoized history
+            st.rerun()
 
 def chat_page():
     """
@@ -318,7 +538,8 @@ def chat_page():
     st.session_state.setdefault('is_guest', True)
     st.session_state.setdefault('username', f"guest_{str(uuid.uuid4())[:8]}")
     st.session_state.setdefault('chat_history', [])
-    st.session_state.setdefault('form_key', str(uuid.uuid4()))
+    # Plain counter for widget keys; bump it to get a fresh form
+    st.session_state.setdefault('form_key', 0)
     
     # Set default API key for guest users
     if st.session_state.is_guest and (not st.session_state.get('api_key') or st.session_state.api_key == 'None'):
@@ -369,134 +590,8 @@ def chat_page():
         </div>
     ''', unsafe_allow_html=True)
 
-    # Create FOOTER with form inside
-    with st.container():
-        with st.form(key=f'chat_form_{st.session_state.form_key}', clear_on_submit=True):
-            user_input = st.text_area(
-                "Your message",
-                label_visibility="collapsed",
-                placeholder="Let Bridge route your prompt...",
-                key=f"user_input_{st.session_state.form_key}",
-                height=60
-            )
-        
-            col1, col2, col3 = st.columns([3, 1, 1])
-            with col1:
-                vibe = st.selectbox(
-                    "Style",
-                    ["Business/Professional", "Academic/Research",
-                     "Technical/Development", "Daily/General", "Creative/Emotional"],
-                    key=f"vibe_{st.session_state.form_key}",
-                    label_visibility="collapsed"
-                )
-            with col2:
-                nature = st.selectbox(
-                    "Length",
-                    ["Short", "Medium", "Detailed"],
-                    key=f"nature_{st.session_state.form_key}",
-                    label_visibility="collapsed"
-                )
-            with col3:
-                submit_button = st.form_submit_button("Send", use_container_width=True, type="primary")
-            
-            if submit_button and user_input.strip():
-                # Add user message to chat history
-                st.session_state.chat_history.append({
-                    "role": "user", 
-                    "content": user_input,
-                    "vibe": vibe,
-                    "nature": nature,
-                    "timestamp": datetime.now().strftime("%H:%M")
-                })
-    
-                # Set loading state
-                st.session_state.waiting_for_response = True
-                st.session_state.current_response = ""
-    
-                # Rerun to show user message and spinner
-                st.rerun()
-
-    # Show spinner if we're waiting for a response
-    if st.session_state.get('waiting_for_response', False):
-        with st.spinner('Bridge is routing your request...'):
-            # Only run the API call if we haven't started it yet
-            if not st.session_state.get('api_call_started', False):
-                st.session_state.api_call_started = True
-                st.rerun()
-            else:
-                # This is where the API call happens
-                try:
-                    response = send_message(
-                        st.session_state.chat_history[-1]["content"],
-                        st.session_state.chat_history[-1]["vibe"],
-                        st.session_state.chat_history[-1]["nature"],
-                        confidence=True
-                    )
-                    
-                    # Debug: Print the full response structure
-                    print("\n=== DEBUG: Full Response ===")
-                    print(response)
-                    print("=== End of Response ===\n")
-                
-                    if response and 'response' in response:
-                        # Process the response...
-                        model_metadata = response.get('model_metadata', {})
-                        # print("\n=== DEBUG: Model Metadata ===")
-                        # print(model_metadata)
-                        # print("=== End of Model Metadata ===\n")
-                        
-                        model_name = model_metadata.get("llm_used", "BRIDGE").upper()
-                        if model_name.lower() == "unknown":
-                            model_name = "BRIDGE"
-                        
-                        # Debug: Check for follow-up questions
-                        print("\n=== DEBUG: Checking for follow-up questions ===")
-                        print(f"Response keys: {response.keys()}")
-                        if 'follow_up_questions' in response:
-                            print(f"Follow-up questions found: {response['follow_up_questions']}")
-                        print("=== End of Follow-up Check ===\n")
-                        
-                        # Add AI response to history
-                        ai_response = response['response']
-                        
-                        # Add follow-up questions if they exist
-                        if 'follow_up_questions' in response and response['follow_up_questions']:
-                            questions = response['follow_up_questions']
-                            print(f"\n=== DEBUG: Processing {len(questions)} follow-up questions ===")
-                            if isinstance(questions, list):
-                                questions_html = "<br><br>" + "<br>• ".join([""] + questions)
-                                print(f"Questions HTML: {questions_html}")
-                                ai_response += questions_html
-                            print("=== End of Questions Processing ===\n")
-                        
-                        ai_message = {
-                            "role": "ai",
-                            "content": ai_response,
-                            "vibe": st.session_state.chat_history[-1]["vibe"],
-                            "nature": st.session_state.chat_history[-1]["nature"],
-                            "timestamp": datetime.now().strftime("%H:%M"),
-                            "model_metadata": model_metadata,
-                            "is_streaming": False
-                        }
-                        st.session_state.chat_history.append(ai_message)
-                
-                        # Reset states
-                        st.session_state.waiting_for_response = False
-                        st.session_state.api_call_started = False
-                        st.rerun()
-                
-                except Exception as e:
-                    st.error(f"Error getting response: {str(e)}")
-                    st.session_state.waiting_for_response = False
-                    st.session_state.api_call_started = False
-                    st.rerun()
-                
-        # Show spinner if we're waiting for a response
-        if st.session_state.get('waiting_for_response', False):
-            with st.spinner('Bridge is routing your request...'):
-                pass  # Just show the spinner
-                
-        st.markdown('</div>', unsafe_allow_html=True)
+    # Create FOOTER with form inside; submitting it reruns only this fragment
+    _input_form()
 
 if __name__ == "__main__":
     chat_page()
\ No newline at end of file
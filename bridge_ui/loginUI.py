@@ -13,7 +13,7 @@ Key Features:
 
 Dependencies:
     streamlit: Web application framework
-    requests: HTTP client for API communication
+    httpx: Async HTTP client for API communication
     asyncio: Asynchronous operations
     pathlib: Path manipulation
     uuid: Generate unique identifiers
@@ -22,19 +22,21 @@ Dependencies:
 import os
 import sys
 import asyncio
+import threading
 import streamlit as st
 from pathlib import Path
-import requests
+import httpx
+import orjson
 import logging
+import re
 import uuid
 
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-# Now import local modules
-from api.userHandler import create_user, verify_user
-from bridge_ui.chatUI import chat_page
+# Local modules (bridge_ui.chatUI) are imported where the chat is shown, so the
+# login form does not pay for them
 
 st.set_page_config(
     page_title="BRIDGE",
@@ -45,11 +47,69 @@ st.set_page_config(
 # API configuration
 API_BASE_URL = "http://localhost:8000"
 
+# Session state defaults applied by main(); callables are factories for mutable values
+SESSION_DEFAULTS = {
+    'logged_in': False,
+    'api_key': None,
+    'username': None,
+    'show_signup': False,
+    'is_guest': False,
+    'chat_history': list,
+    'show_chat': False,
+}
+
+@st.cache_resource
+def get_http_client():
+    """
+    Create the pooled HTTP client used for login and signup calls, once per process.
+    
+    An async client's connections belong to the event loop that opened them, so the
+    client lives on a dedicated background loop instead of the short-lived loops
+    started by asyncio.run. Keep-alive connections are then reused across logins.
+    
+    Returns:
+        tuple: (event loop, httpx.AsyncClient)
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="bridge-ui-http", daemon=True).start()
+    client = httpx.AsyncClient(
+        base_url=API_BASE_URL,
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=20, keepalive_expiry=30.0)
+    )
+    return loop, client
+
+def run_async(coro):
+    """Run a coroutine on the HTTP client's loop and wait for its result."""
+    loop, _ = get_http_client()
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
 def redirect_to_chat():
     """Redirect to the chat interface."""
     st.session_state['show_chat'] = True
     st.rerun()
 
+# CSS minification patterns
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCT_RE = re.compile(r'\s*([{};,>])\s*')
+
+def _minify_css(css: str) -> str:
+    """
+    Strip comments and redundant whitespace from a stylesheet.
+    
+    Spaces around ':' are kept because they are significant in selectors
+    (e.g. 'div :hover' vs 'div:hover').
+    """
+    css = _CSS_COMMENT_RE.sub('', css)
+    css = _CSS_SPACE_RE.sub(' ', css)
+    return _CSS_PUNCT_RE.sub(r'\1', css).strip()
+
+@st.cache_data
+def _read_css(path_str: str) -> str:
+    """Read and minify a stylesheet once per process; reruns reuse the cached blob."""
+    return _minify_css(Path(path_str).read_text(encoding="utf-8"))
+
 def load_css():
     """
     Load and inject CSS styles from an external file into the Streamlit app.
@@ -63,6 +123,7 @@ def load_css():
     Note:
         - Uses pathlib for cross-platform path resolution
         - Handles file reading with UTF-8 encoding
+        - The file is read and minified once, then cached by _read_css
         - Gracefully handles file not found and other I/O errors
         
     Raises:
@@ -71,8 +132,7 @@ def load_css():
     """ 
     css_file = Path(__file__).parent / "static" / "styles.css"
     try:
-        with open(css_file, 'r', encoding='utf-8') as f:
-            st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+        st.markdown(f'<style>{_read_css(str(css_file))}</style>', unsafe_allow_html=True)
     except Exception as e:
         st.error(f"Error loading CSS: {e}")
 
@@ -83,70 +143,77 @@ def login_page():
         st.query_params.clear()
         st.rerun()
     
-    # If already logged in, redirect to chat
+    # If already logged in, go straight to chat
     if st.session_state.get('logged_in'):
-        st.query_params["page"] = "chat"
-        st.rerun()
+        from bridge_ui.chatUI import chat_page
+        chat_page()
+        return
     
     load_css()
     
-    st.markdown("<div class='login-container'>", unsafe_allow_html=True)
-    st.markdown("<h1 class='welcome-text'>Welcome to BRIDGE</h1>", unsafe_allow_html=True)
-    st.markdown("<p class='subtitle'>Bridge your prompts. Maximize your answers.</p>", unsafe_allow_html=True)
+    # Everything on the login page lives in one slot so it can be swapped for the chat
+    login_slot = st.empty()
+    with login_slot.container():
+        st.markdown("<div class='login-container'>", unsafe_allow_html=True)
+        st.markdown("<h1 class='welcome-text'>Welcome to BRIDGE</h1>", unsafe_allow_html=True)
+        st.markdown("<p class='subtitle'>Bridge your prompts. Maximize your answers.</p>", unsafe_allow_html=True)
     
-    with st.form("login_form"):
-        st.markdown("<h3 class='form-title'>Sign In</h3>", unsafe_allow_html=True)
+        with st.form("login_form"):
+            st.markdown("<h3 class='form-title'>Sign In</h3>", unsafe_allow_html=True)
         
-        username = st.text_input("Username or Email", key="login_username")
-        password = st.text_input("Password", type="password", key="login_password")
+            username = st.text_input("Username or Email", key="login_username")
+            password = st.text_input("Password", type="password", key="login_password")
         
-        login_button = st.form_submit_button("Sign In", type="primary")
+            login_button = st.form_submit_button("Sign In", type="primary")
         
-        if login_button:
-            if not username or not password:
-                st.error("Please enter both username and password")
-            else:
-                with st.spinner("Signing in..."):
-                    success, message, result = asyncio.run(handle_login(username, password))
-                    if success:
-                        st.session_state.clear()
-                        st.session_state.update({
-                            'api_key': result['api_key'],
-                            'logged_in': True,
-                            'username': result['username'],
-                            'is_guest': False,
-                            'chat_history': []
-                        })
-                        st.query_params["page"] = "chat"
-                        st.rerun()
-                    else:
-                        st.error(message)
+            if login_button:
+                if not username or not password:
+                    st.error("Please enter both username and password")
+                else:
+                    with st.spinner("Signing in..."):
+                        success, message, result = run_async(handle_login(username, password))
+                        if success:
+                            st.session_state.clear()
+                            st.session_state.update({
+                                'api_key': result['api_key'],
+                                'logged_in': True,
+                                'username': result['username'],
+                                'is_guest': False,
+                                'chat_history': [],
+                                'show_chat': True
+                            })
+                        else:
+                            st.error(message)
     
-    st.markdown("<div class='signup-prompt'>Don't have an account?</div>", unsafe_allow_html=True)
+        st.markdown("<div class='signup-prompt'>Don't have an account?</div>", unsafe_allow_html=True)
     
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button("Create Account", key="show_signup_btn", use_container_width=True):
-            st.session_state['show_signup'] = True
-            st.rerun()
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Create Account", key="show_signup_btn", use_container_width=True):
+                st.session_state['show_signup'] = True
+                st.rerun()
     
-    with col2:
-        if st.button("Continue as Guest", key="guest_login_btn", use_container_width=True, type="secondary"):
-            # Clear any existing session state
-            st.session_state.clear()
-            # Set guest session state
-            st.session_state.update({
-                'logged_in': True,
-                'is_guest': True,
-                'username': f"guest_{str(uuid.uuid4())[:8]}",
-                'chat_history': [],
-                'api_key': "guest_key"
-            })
-            # Use st.experimental_set_query_params for navigation
-            st.query_params["page"] = "chat"
-            st.rerun()
+        with col2:
+            if st.button("Continue as Guest", key="guest_login_btn", use_container_width=True, type="secondary"):
+                # Clear any existing session state
+                st.session_state.clear()
+                # Set guest session state
+                st.session_state.update({
+                    'logged_in': True,
+                    'is_guest': True,
+                    'username': f"guest_{str(uuid.uuid4())[:8]}",
+                    'chat_history': [],
+                    'api_key': "guest_key",
+                    'show_chat': True
+                })
     
-    st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # Switch to the chat within this run instead of redirecting through a rerun
+    if st.session_state.get('show_chat'):
+        login_slot.empty()
+        from bridge_ui.chatUI import chat_page
+        chat_page()
 
 def signup_page():
     """
@@ -195,7 +262,7 @@ def signup_page():
             else:
                 # Server-side valid ation and registration
                 with st.spinner("Creating account..."):
-                    success, result = asyncio.run(handle_signup(username, password, email, user_type))
+                    success, result = run_async(handle_signup(username, password, email, user_type))
                     if success:
                         st.success("Account created successfully! Please log in.")
                         # Redirect to login page    
@@ -208,6 +275,9 @@ def signup_page():
     # Close signup container
     st.markdown("</div>", unsafe_allow_html=True)
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_ERROR_PREFIXES = ("Signup failed: ", "Login failed: ", "Registration failed: ")
+
 async def handle_login(username: str, password: str) -> tuple[bool, str, dict]:
     """
     Handle user login.
@@ -220,13 +290,15 @@ async def handle_login(username: str, password: str) -> tuple[bool, str, dict]:
         tuple: (success: bool, message: str, data: dict) where data contains api_key and username if successful
     """
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/users/login",
-            json={"username": username, "password": password}
+        _, client = get_http_client()
+        response = await client.post(
+            "/users/login",
+            content=orjson.dumps({"username": username, "password": password}),
+            headers=_JSON_HEADERS
         )
         
         try:
-            data = response.json()
+            data = orjson.loads(response.content)
             if data.get("success") is True and data.get("user"):
                 return True, "Login successful", {
                     "api_key": data["user"].get("api_key"),
@@ -277,9 +349,11 @@ async def handle_signup(username: str, password: str, email: str = "", user_type
     """
     try:
         # Prepare and send registration request
-        response = requests.post(
-            f"{API_BASE_URL}/users/register",
-            json={"username": username, "password": password, "email": email, "user_type": user_type}
+        _, client = get_http_client()
+        response = await client.post(
+            "/users/register",
+            content=orjson.dumps({"username": username, "password": password, "email": email, "user_type": user_type}),
+            headers=_JSON_HEADERS
         )
         
         # Handle API response, check for successful registration (HTTP 201 Created)   
@@ -287,7 +361,7 @@ async def handle_signup(username: str, password: str, email: str = "", user_type
             return True, "Account created successfully"
         else:
             try:
-                error_data = response.json()
+                error_data = orjson.loads(response.content)
                 error_msg = error_data.get('detail', str(error_data))
                 return False, error_msg
             except ValueError:
@@ -307,56 +381,45 @@ def format_error_message(error: str) -> str:
     # Handle JSON string errors
     if error.startswith('{') and error.endswith('}'):
         try:
-            import json
-            error_json = json.loads(error)
+            error_json = orjson.loads(error)
             if 'detail' in error_json:
                 return str(error_json['detail'])
         except:
             pass
             
     # Remove redundant prefixes
-    for prefix in ["Signup failed: ", "Login failed: ", "Registration failed: "]:
-        if error.startswith(prefix):
-            error = error[len(prefix):]
+    if error.startswith(_ERROR_PREFIXES):
+        for prefix in _ERROR_PREFIXES:
+            if error.startswith(prefix):
+                error = error[len(prefix):]
     
     return error
 
 def main():
     """Main application entry point."""
     # Initialize session state
-    if 'logged_in' not in st.session_state:
-        st.session_state.logged_in = False
-    if 'api_key' not in st.session_state:
-        st.session_state.api_key = None
-    if 'username' not in st.session_state:
-        st.session_state.username = None
-    if 'show_signup' not in st.session_state:
-        st.session_state.show_signup = False
-    if 'is_guest' not in st.session_state:
-        st.session_state.is_guest = False
-    if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = []
-    if 'show_chat' not in st.session_state:
-        st.session_state.show_chat = False
+    for key, default in SESSION_DEFAULTS.items():
+        if key not in st.session_state:
+            # Mutable defaults are stored as factories so sessions never share them
+            st.session_state[key] = default() if callable(default) else default
     
     # Configure logging
     logging.basicConfig(level=logging.INFO)
     
-    # Check if we should show chat or login
-    query_params = st.query_params
+    # Check if we should show chat or login (query_params values are plain strings)
+    page = st.query_params.get("page")
     
-    # If user is trying to access chat but not logged in, redirect to login
-    if query_params.get("page") == ["chat"] and not st.session_state.get('logged_in'):
+    # If user is trying to access chat but not logged in, fall through to login
+    if page == "chat" and not st.session_state.get('logged_in'):
         st.query_params.clear()
-        st.rerun()
-        return
+        page = None
         
     # If user is logged in, show chat
-    if query_params.get("page") == ["chat"] or st.session_state.get('logged_in'):
+    if st.session_state.get('logged_in'):
         from bridge_ui.chatUI import chat_page
         chat_page()
     # If user is logging out
-    elif query_params.get("page") == ["login"]:
+    elif page == "login":
         login_page()
     # Show signup page if that's what was requested
     elif st.session_state.get('show_signup'):
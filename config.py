@@ -6,6 +6,8 @@ loaded from environment variables with sensible defaults.
 """
 
 import os
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from typing import Dict, Any
 from dotenv import load_dotenv
 
@@ -80,19 +82,43 @@ LOGGING_CONFIG = {
     "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 }
 
+
+@dataclass(frozen=True)
+class Settings:
+    """Immutable snapshot of the configuration, built once at import."""
+    env: str
+    debug: bool
+    api: Dict[str, Any]
+    llm: Dict[str, Any]
+    vibes: Dict[str, str]
+    database: Dict[str, Any]
+    logging: Dict[str, Any]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the settings as the nested dictionary callers index into."""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+SETTINGS = Settings(
+    env=ENV,
+    debug=DEBUG,
+    api=API_CONFIG,
+    llm=LLM_CONFIG,
+    vibes=VIBE_DESCRIPTIONS,
+    database=DATABASE_CONFIG,
+    logging=LOGGING_CONFIG
+)
+
+
+@lru_cache(maxsize=1)
 def get_config() -> Dict[str, Any]:
     """
     Get the complete configuration dictionary.
     
+    The dictionary is built from ``SETTINGS`` on the first call and the same
+    object is returned afterwards.
+    
     Returns:
         Dict[str, Any]: The complete configuration
     """
-    return {
-        "env": ENV,
-        "debug": DEBUG,
-        "api": API_CONFIG,
-        "llm": LLM_CONFIG,
-        "vibes": VIBE_DESCRIPTIONS,
-        "database": DATABASE_CONFIG,
-        "logging": LOGGING_CONFIG
-    }
\ No newline at end of file
+    return SETTINGS.as_dict()
@@ -1,11 +1,12 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from pymongo import MongoClient
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time
 from dotenv import load_dotenv
 import os
 
+# Must be the first Streamlit call: cached loaders below render a spinner on a miss
+st.set_page_config(page_title="BRIDGE Dashboard", layout="wide", page_icon="📊")
+
 # ========== Load environment variables ==========
 load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI")
@@ -16,52 +17,132 @@ if not MONGO_URI:
     st.stop()
 
 # ========== Connect to MongoDB ==========
+# Fields the dashboard actually reads, flattened to their display names on the server
+QA_PROJECTION = {
+    "_id": 0,
+    "Date": "$timestamp",
+    "User": "$user_id",
+    "Question": "$question",
+    "Answer": "$answer",
+    "Model": "$metadata.model",
+    "Confidence": "$metadata.confidence",
+    "Tokens": "$metadata.tokens",
+    "COT Steps": "$metadata.cot_steps",
+}
+USER_PROJECTION = {"_id": 0, "username": 1, "user_type": 1}
+# Sender key as the dashboard shows it: trimmed, lower-cased, "guest" when missing
+USER_KEY_EXPR = {"$cond": [
+    {"$eq": [{"$type": "$user_id"}, "string"]},
+    {"$toLower": {"$trim": {"input": "$user_id"}}},
+    "guest",
+]}
+QA_COLUMNS = ["Date", "User", "Question", "Answer", "Model", "Confidence", "Tokens", "COT Steps", "User Type"]
+
+@st.cache_resource
+def get_mongo():
+    """Return the dashboard database handle; the client is shared across reruns and sessions."""
+    from pymongo import MongoClient
+    return MongoClient(MONGO_URI)[MONGO_DB_NAME]
+
+@st.cache_resource
+def _plotly():
+    """Import plotly.express on first use; only the User Types chart needs it."""
+    import plotly.express as px
+    return px
+
+def _qa_query(start_date, end_date, model="All"):
+    """Build the qa_records filter for a date range (inclusive) and an optional model."""
+    query = {"timestamp": {
+        "$gte": datetime.combine(start_date, time.min),
+        "$lt": datetime.combine(end_date + timedelta(days=1), time.min),
+    }}
+    if model == "unknown":
+        # Records without a model are shown as "unknown"
+        query["metadata.model"] = {"$in": [None, "unknown"]}
+    elif model != "All":
+        query["metadata.model"] = model
+    return query
+
+@st.cache_data(ttl=300)
+def load_qa(start_date, end_date, model="All"):
+    """
+    Fetch QA records in [start_date, end_date], newest first, optionally for one model.
+    
+    The date and model filters run in MongoDB, so only the selected window is
+    transferred. The cursor is fed straight into a DataFrame with the display
+    columns. Results are cached for five minutes per filter combination.
+    """
+    pipeline = [
+        {"$match": _qa_query(start_date, end_date, model)},
+        {"$sort": {"timestamp": -1}},
+        {"$project": QA_PROJECTION},
+    ]
+    cursor = get_mongo().qa_records.aggregate(pipeline)
+    return pd.DataFrame.from_records(cursor, columns=QA_COLUMNS)
+
+@st.cache_data(ttl=300)
+def load_top_users(start_date, end_date, model="All", limit=5):
+    """Rank senders in the filtered window by number of questions, computed in MongoDB."""
+    pipeline = [
+        {"$match": _qa_query(start_date, end_date, model)},
+        {"$group": {
+            "_id": USER_KEY_EXPR,
+            "Num_Queries": {"$sum": 1},
+            "Avg_Confidence": {"$avg": "$metadata.confidence"},
+        }},
+        {"$sort": {"Num_Queries": -1}},
+        {"$limit": limit},
+        {"$project": {"_id": 0, "User": "$_id", "Num_Queries": 1, "Avg_Confidence": 1}},
+    ]
+    return list(get_mongo().qa_records.aggregate(pipeline))
+
+@st.cache_data(ttl=300)
+def load_models():
+    """List the distinct models that appear in qa_records, with missing ones as "unknown"."""
+    pipeline = [{"$group": {"_id": {"$ifNull": ["$metadata.model", "unknown"]}}}]
+    return sorted(str(doc["_id"]) for doc in get_mongo().qa_records.aggregate(pipeline))
+
+@st.cache_data(ttl=300)
+def load_question_counts():
+    """Count all-time questions per normalized sender; one row per sender, not per record."""
+    pipeline = [{"$group": {"_id": USER_KEY_EXPR, "count": {"$sum": 1}}}]
+    return {doc["_id"]: doc["count"] for doc in get_mongo().qa_records.aggregate(pipeline)}
+
+@st.cache_data(ttl=300)
+def load_user_type_counts():
+    """Count registered users per normalized user_type."""
+    pipeline = [{"$group": {
+        "_id": {"$toLower": {"$trim": {"input": {"$toString": {"$ifNull": ["$user_type", "unknown"]}}}}},
+        "count": {"$sum": 1},
+    }}]
+    return {doc["_id"]: doc["count"] for doc in get_mongo().users.aggregate(pipeline)}
+
+@st.cache_data(ttl=300)
+def load_users():
+    """Fetch registered users. Cached for five minutes."""
+    return list(get_mongo().users.find({}, projection=USER_PROJECTION))
+
 try:
-    client = MongoClient(MONGO_URI)
-    db = client[MONGO_DB_NAME]
-    records = list(db.qa_records.find().sort("timestamp", -1))
-    user_records = list(db.users.find())
+    user_records = load_users()
+    model_options = load_models()
 except Exception as e:
     st.error(f"Error connecting to MongoDB: {str(e)}")
     st.stop()
 
+if not model_options:
+    st.warning("No records found in qa_records collection.")
+    st.stop()
+MODEL_CHOICES = ["All"] + model_options
+
 # ========== Build user type map ==========
 user_df = pd.DataFrame(user_records)
 user_df["username"] = user_df["username"].astype(str).str.strip().str.lower()
 user_df["user_type"] = user_df["user_type"].fillna("unknown").astype(str).str.strip().str.lower()
 user_df["User Type"] = user_df["user_type"]
-user_type_map = dict(zip(user_df["username"], user_df["User Type"]))
-
-# ========== Prepare QA Data ==========
-data = []
-for r in records:
-    uid = r.get("user_id")
-    user_id = uid.strip().lower() if isinstance(uid, str) else "guest"
-    user_type = user_type_map.get(user_id, "guest")
-    data.append({
-        "Date": r.get("timestamp"),
-        "User": user_id,
-        "Question": r.get("question", ""),
-        "Answer": r.get("answer", ""),
-        "Model": r.get("metadata", {}).get("model", "unknown"),
-        "Confidence": r.get("metadata", {}).get("confidence"),
-        "Tokens": r.get("metadata", {}).get("tokens"),
-        "COT Steps": r.get("metadata", {}).get("cot_steps"),
-        "User Type": user_type,
-    })
-
-df = pd.DataFrame(data)
-
-if df.empty:
-    st.warning("No records found in qa_records collection.")
-    st.stop()
-
-# ========== Process ==========
-df["Date_dt"] = pd.to_datetime(df["Date"])
-df["COT Summary"] = df["COT Steps"].apply(lambda steps: " → ".join(steps) if isinstance(steps, list) else "")
+# Username -> user type lookup for vectorized .map; the last entry wins for duplicate names
+user_type_series = user_df.drop_duplicates(subset="username", keep="last").set_index("username")["User Type"]
 
 # ========== Streamlit UI ==========
-st.set_page_config(page_title="BRIDGE Dashboard", layout="wide", page_icon="📊")
 st.markdown("""
     <h1 style='display: flex; align-items: center;'>
         <span style='font-size: 2.5rem;'>📊 BRIDGE Dashboard</span>
@@ -77,18 +158,40 @@ with st.container():
     with c2:
         end_date = st.date_input("End Date", datetime.today())
     with c3:
-        selected_model = st.selectbox("LLM Model", ["All"] + sorted(df["Model"].dropna().unique()))
+        selected_model = st.selectbox("LLM Model", MODEL_CHOICES)
 
-filtered_df = df[(df["Date_dt"].dt.date >= start_date) & (df["Date_dt"].dt.date <= end_date)]
-if selected_model != "All":
-    filtered_df = filtered_df[filtered_df["Model"] == selected_model]
+# ========== Prepare QA Data ==========
+try:
+    df = load_qa(start_date, end_date, selected_model)
+    top_user_records = load_top_users(start_date, end_date, selected_model)
+    user_type_totals = load_user_type_counts()
+    question_counts = load_question_counts()
+except Exception as e:
+    st.error(f"Error connecting to MongoDB: {str(e)}")
+    st.stop()
+
+df["User"] = df["User"].astype(object).str.strip().str.lower().fillna("guest")
+df["Question"] = df["Question"].fillna("")
+df["Answer"] = df["Answer"].fillna("")
+df["Model"] = df["Model"].fillna("unknown")
+df["User Type"] = df["User"].map(user_type_series).fillna("guest")
+# Low-cardinality labels: filter and de-duplicate on integer codes instead of hashing strings
+for col in ("Model", "User Type", "User"):
+    df[col] = df[col].astype("category")
+
+# ========== Process ==========
+df["Date"] = pd.to_datetime(df["Date"], errors="coerce", cache=True)
 
-# KPI Metrics
+# Date and model filters were applied by the query
+filtered_df = df
+
+# KPI Metrics, computed in one aggregation call (mean skips missing values)
+kpi = filtered_df.agg({"Question": "size", "Tokens": "mean", "User": "nunique", "Confidence": "mean"})
 k1, k2, k3, k4 = st.columns(4)
-k1.metric("🔢 Total Queries", len(filtered_df))
-k2.metric("🧠 Avg Tokens", f"{filtered_df['Tokens'].dropna().mean():.1f}" if filtered_df['Tokens'].notna().any() else "N/A")
-k3.metric("👤 Unique Query Senders", filtered_df['User'].nunique())
-k4.metric("📂 Registered Users", len(user_df.drop_duplicates(subset="username")))
+k1.metric("🔢 Total Queries", int(kpi["Question"]))
+k2.metric("🧠 Avg Tokens", f"{kpi['Tokens']:.1f}" if pd.notna(kpi["Tokens"]) else "N/A")
+k3.metric("👤 Unique Query Senders", int(kpi["User"]))
+k4.metric("📂 Registered Users", user_df["username"].nunique())
 
 # Row 1: Model Usage / User Types
 row1_col1, row1_col2 = st.columns([2, 1])
@@ -96,16 +199,21 @@ row2_col1, row2_col2 = st.columns([2, 1])
 
 with row1_col2:
     st.subheader("👥 User Types")
-    pie_combined = pd.concat([
-        user_df[["User Type"]],
-        df[df["User Type"] == "guest"]["User Type"].to_frame()  # Include guests from questions
-    ], ignore_index=True)
+    # Include guests from questions: one row per all-time question by an unregistered sender
+    guest_questions = sum(
+        count for uid, count in question_counts.items()
+        if user_type_series.get(uid, "guest") == "guest"
+    )
+    type_counts = pd.Series(user_type_totals, dtype="int64").sort_values(ascending=False)
+    if guest_questions:
+        type_counts["guest"] = type_counts.get("guest", 0) + guest_questions
+        type_counts = type_counts.sort_values(ascending=False)
 
-    user_type_counts = pie_combined["User Type"].value_counts().reset_index()
-    user_type_counts.columns = ["User Type", "Count"]
+    user_type_counts = type_counts.rename_axis("User Type").reset_index(name="Count")
     user_type_counts["Count"] = pd.to_numeric(user_type_counts["Count"], errors="coerce").fillna(0).astype(int)
     user_type_counts["Percent"] = (user_type_counts["Count"] / user_type_counts["Count"].sum() * 100).round(1).astype(str) + "%"
 
+    px = _plotly()
     fig2 = px.pie(
         user_type_counts,
         names="User Type",
@@ -120,9 +228,8 @@ with row1_col2:
 
 with row1_col1:
     st.subheader("🎯 Avg Answer Confidence")
-    if filtered_df["Confidence"].notna().any():
-        avg_conf = filtered_df["Confidence"].mean()
-        st.metric("Average Confidence", f"{avg_conf:.1%}")
+    if pd.notna(kpi["Confidence"]):
+        st.metric("Average Confidence", f"{kpi['Confidence']:.1%}")
     else:
         st.info("No confidence data available.")
 
@@ -131,18 +238,9 @@ with row1_col1:
 
 # Top Users
 st.subheader("👑 Top Users by Activity")
-top_users = (
-    filtered_df.groupby("User")
-    .agg(
-        Num_Queries=("Question", "count"),
-        Avg_Confidence=("Confidence", "mean"),
-        User_Type=("User Type", "first")
-    )
-    .reset_index()
-    .sort_values(by="Num_Queries", ascending=False)
-)
-top_n = 5 if len(top_users) > 5 else len(top_users)
-st.dataframe(top_users.head(top_n), use_container_width=True)
+top_users = pd.DataFrame(top_user_records, columns=["User", "Num_Queries", "Avg_Confidence"])
+top_users["User_Type"] = top_users["User"].map(user_type_series).fillna("guest")
+st.dataframe(top_users, use_container_width=True)
 
 # Drilldown
 st.subheader("🔍 Drilldown by User")
@@ -151,6 +249,10 @@ selected_user = st.selectbox("Select a user to explore", unique_users)
 user_df_selected = filtered_df[filtered_df["User"] == selected_user]
 if not user_df_selected.empty:
     st.markdown(f"**Total Queries:** {len(user_df_selected)}")
+    # Only the drilldown shows COT summaries, so build them for the selected user's rows alone
+    user_df_selected = user_df_selected.assign(
+        **{"COT Summary": user_df_selected["COT Steps"].map(lambda steps: " → ".join(steps) if isinstance(steps, list) else "")}
+    )
     st.dataframe(user_df_selected[["Date", "Question", "Model", "Confidence", "Tokens", "COT Summary"]], use_container_width=True)
 else:
     st.info("No data available for selected user.")
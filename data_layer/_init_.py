@@ -2,6 +2,6 @@
 Data layer package for handling database operations.
 """
 
-from .mongoHandler import db_handler
+from .mongoHandler import get_db_handler, get_async_db_handler, close_async_db_handler
 
-__all__ = ['db_handler']
\ No newline at end of file
+__all__ = ['get_db_handler', 'get_async_db_handler', 'close_async_db_handler']
\ No newline at end of file
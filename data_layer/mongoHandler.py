@@ -16,9 +16,23 @@ Environment Variables:
     MONGO_URI: MongoDB connection string (required)
     DB_NAME: Database name (default: 'bridge_db')
     EMBEDDING_MODEL: Sentence transformer model (default: 'all-MiniLM-L6-v2')
+    EMBEDDING_QUANTIZE: 'true' to run the embedding model with int8 dynamic
+        quantization on CPU (default: 'false')
+    EMBEDDING_THREADS: Intra-op threads torch uses for encoding (default: CPU count)
+    MONGO_MAX_POOL: Maximum connections in the sync client pool (default: 200)
+    MONGO_MIN_POOL: Connections kept open in the sync client pool (default: 10)
+    MONGO_ASYNC_MAX_POOL: Maximum connections in the async (Motor) client pool (default: 100)
+    MONGO_ASYNC_MIN_POOL: Connections kept open in the async (Motor) client pool (default: 2)
+    MONGO_MAX_CONNECTING: Connections a pool may open concurrently (default: 5)
+    MONGO_MAX_IDLE_MS: Idle time before a pooled connection is closed (default: 60000)
+    MONGO_SOCKET_TIMEOUT_MS: Per-operation socket read timeout (default: 30000)
+    MONGO_VECTOR_INDEX: Atlas Vector Search index on qa_records.embedding; when set,
+        semantic search runs server-side with $vectorSearch (default: unset)
 
 Example Usage:
-    from data_layer.mongoHandler import db_handler
+    from data_layer.mongoHandler import get_db_handler
+    
+    db_handler = get_db_handler()
     
     # Store a new QA pair
     qa_id = db_handler.save_qa_record(
@@ -36,48 +50,325 @@ Example Usage:
 
 Dependencies:
     - pymongo: MongoDB Python driver
+    - motor: Async MongoDB driver for the FastAPI request path
     - sentence-transformers: For semantic search embeddings
-    - scikit-learn: For cosine similarity calculations
+    - numpy: Vectorized similarity scoring over the stored embeddings
     - python-dotenv: For environment variable management
 
 Note: This module implements a singleton pattern to ensure only one database connection
-is maintained throughout the application lifecycle.
+is maintained throughout the application lifecycle. Importing it doesn't connect; the
+handlers are created by get_db_handler() / get_async_db_handler() on first use.
 """
 
 import os
+import atexit
 import logging
 import json
+import hashlib
+import secrets
 from typing import Dict, Any, Optional, List
-from pymongo import MongoClient
-from pymongo.errors import PyMongoError, DuplicateKeyError
-from bson import ObjectId
+from pymongo import MongoClient, WriteConcern, UpdateOne, IndexModel
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError, DuplicateKeyError, OperationFailure
+from bson import ObjectId, Binary
+from bson.codec_options import CodecOptions
 import certifi
 from dotenv import load_dotenv
 import datetime
 import time
-from sklearn.metrics.pairwise import cosine_similarity
+import queue
+import threading
+from functools import lru_cache
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer   
+from api._auth_ctx import hash_password, verify_password, verify_dummy_password, run_in_hash_pool
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application entry point
 logger = logging.getLogger(__name__)
 
+# User documents decode into plain dicts with naive UTC datetimes; pinned on the
+# collection so client-level options can't add per-field timezone conversion to
+# the auth path
+USER_CODEC_OPTIONS = CodecOptions(document_class=dict, tz_aware=False)
+
+# Unique user indexes, created by both handlers; create_user relies on them for duplicates
+USER_INDEXES = [
+    IndexModel("username", unique=True),
+    IndexModel("email", unique=True),
+    IndexModel("api_key", unique=True, sparse=True)
+]
+
+# Public shape of a user returned by get_user, built server-side: _id comes back
+# as the string "id" and the password hash is never sent over the wire
+PUBLIC_USER_PROJECTION = {
+    "_id": 0,
+    "id": {"$toString": "$_id"},
+    "username": 1,
+    "email": 1,
+    "is_active": {"$ifNull": ["$is_active", True]},
+    "created_at": 1,
+    "last_login": 1
+}
+
+# QA records are a recomputable answer cache: acknowledged by the primary is enough,
+# no need to wait for majority replication on every save
+QA_WRITE_CONCERN = WriteConcern(w=1)
+
+# Fields verify_user reads: the hash to check plus what it returns
+VERIFY_USER_PROJECTION = {"hashed_password": 1, "username": 1, "email": 1, "api_key": 1, "is_active": 1}
+
+# Fields get_user_qa_history returns (_id is included by default)
+QA_HISTORY_PROJECTION = {"question": 1, "answer": 1, "timestamp": 1, "metadata": 1}
+
+def _new_user_document(username: str, email: str, hashed_password: str, user_type: str) -> Dict[str, Any]:
+    """Build a users document with a fresh API key, shared by the sync and async handlers."""
+    return {
+        "username": username,
+        "email": email,
+        "hashed_password": hashed_password,
+        "api_key": f"brdg_{secrets.token_urlsafe(32)}",
+        "user_type": user_type,
+        "is_active": True,
+        "created_at": datetime.datetime.now(datetime.timezone.utc),
+        "last_login": None
+    }
+
+def _duplicate_user_error(error: DuplicateKeyError) -> ValueError:
+    """Translate a unique-index violation on users into the error reported to the caller."""
+    key_pattern = (error.details or {}).get("keyPattern", {})
+    if "username" in key_pattern:
+        return ValueError("Username already exists")
+    if "email" in key_pattern:
+        return ValueError("Email already exists")
+    return ValueError("Username or email already exists")
+
+def _unit_vector(vector) -> np.ndarray:
+    """Return vector as float32 scaled to unit length (zero vectors are left as is)."""
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+# Unit-length embeddings are also kept as int8 (component * 127): a quarter of the
+# bytes of the float list, used by the client-side similarity scan
+EMBEDDING_I8_SCALE = 1.0 / 127
+
+# Atlas Vector Search index definition expected under MONGO_VECTOR_INDEX. Embeddings
+# are unit-length, so dotProduct equals cosine; vibe and nature_of_answer are
+# declared as filter fields so they can narrow the search server-side
+VECTOR_INDEX_DEFINITION = {
+    "fields": [
+        {"type": "vector", "path": "embedding", "numDimensions": 384, "similarity": "dotProduct"},
+        {"type": "filter", "path": "vibe"},
+        {"type": "filter", "path": "nature_of_answer"}
+    ]
+}
+
+def _question_hash(text: str) -> str:
+    """SHA-1 hex digest of a question, the key for indexed exact-match lookups."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def _quantize_embedding(vector: np.ndarray) -> Binary:
+    """Pack a unit-length vector into int8 bytes for the embedding_i8 field."""
+    return Binary(np.clip(np.round(vector * 127), -127, 127).astype(np.int8).tobytes())
+
+def _stored_embedding(value) -> np.ndarray:
+    """Decode a stored embedding (int8 bytes or a float list) to float32."""
+    if isinstance(value, bytes):
+        return np.frombuffer(value, dtype=np.int8).astype(np.float32) * EMBEDDING_I8_SCALE
+    return np.asarray(value, dtype=np.float32)
+
+@lru_cache(maxsize=None)
+def get_embedding_model() -> SentenceTransformer:
+    """
+    Return the process-wide sentence embedding model, loading it on first use.
+    
+    Shared by the MongoDB handler and the local cache so the weights are held once
+    per process, and only by processes that actually embed text.
+    """
+    # Containers often start torch with a single intra-op thread
+    torch.set_num_threads(int(os.getenv("EMBEDDING_THREADS", str(os.cpu_count() or 1))))
+    model = SentenceTransformer(os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"))
+    model.eval()
+    if os.getenv("EMBEDDING_QUANTIZE", "false").lower() == "true":
+        # int8 weights for every Linear layer (the bulk of a MiniLM forward pass);
+        # similarities stay within about 1% of the float model's
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+@lru_cache(maxsize=4096)
+def _query_embedding(model: SentenceTransformer, text: str) -> np.ndarray:
+    """Unit-length float32 embedding of text; repeated texts skip the model forward pass."""
+    with torch.inference_mode():
+        embedding = model.encode(text, convert_to_numpy=True, normalize_embeddings=True).astype(np.float32)
+    # Shared between callers through the cache, so it must not be modified in place
+    embedding.flags.writeable = False
+    return embedding
+
+# Background QA writer: records queued by enqueue_qa_record are saved together once
+# QA_WRITE_BATCH are waiting or QA_WRITE_INTERVAL seconds after the first arrived
+QA_WRITE_BATCH = 64
+QA_WRITE_INTERVAL = 0.05
+
+# Seconds before the in-memory embedding index is reloaded, so records written by
+# other processes become searchable
+EMBEDDING_INDEX_TTL = 300
+
+class _EmbeddingIndex:
+    """
+    In-memory copy of the stored QA embeddings with their vibe / nature_of_answer
+    labels, so semantic search doesn't re-read every embedding from MongoDB.
+    
+    Rows live in a preallocated matrix whose capacity doubles as records are
+    appended; labels are stored as small integer codes for vectorized filtering.
+    """
+    
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.matrix = None
+        self.labels = None
+        self.ids = []
+        self.codes = {}
+        self.size = 0
+        self.loaded_at = None
+    
+    def is_stale(self) -> bool:
+        """Whether the index was never loaded or is older than EMBEDDING_INDEX_TTL."""
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > EMBEDDING_INDEX_TTL
+    
+    def invalidate(self):
+        """Force a reload before the next search."""
+        self.loaded_at = None
+    
+    def reset(self):
+        """Drop all rows ahead of a full reload."""
+        with self.lock:
+            self.matrix = None
+            self.labels = None
+            self.ids = []
+            self.codes = {}
+            self.size = 0
+            self.loaded_at = time.monotonic()
+    
+    def extend(self, record_ids: list, vectors: np.ndarray, vibes: list, natures: list):
+        """Add a batch of embeddings (one row each), growing the matrix in one step if needed."""
+        count = len(record_ids)
+        if not count:
+            return
+        with self.lock:
+            needed = self.size + count
+            if self.matrix is None:
+                capacity = max(1024, needed)
+                self.matrix = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+                self.labels = np.empty((capacity, 2), dtype=np.int32)
+            elif needed > len(self.matrix):
+                capacity = len(self.matrix)
+                while capacity < needed:
+                    capacity *= 2
+                matrix = np.empty((capacity, self.matrix.shape[1]), dtype=np.float32)
+                labels = np.empty((capacity, 2), dtype=np.int32)
+                matrix[:self.size] = self.matrix[:self.size]
+                labels[:self.size] = self.labels[:self.size]
+                self.matrix, self.labels = matrix, labels
+            self.matrix[self.size:needed] = vectors
+            self.labels[self.size:needed] = [
+                (self.codes.setdefault(vibe, len(self.codes)), self.codes.setdefault(nature, len(self.codes)))
+                for vibe, nature in zip(vibes, natures)
+            ]
+            self.ids.extend(record_ids)
+            self.size = needed
+    
+    def search(self, query_embedding: np.ndarray, vibe, nature_of_answer, threshold: float, top_k: int) -> list:
+        """Return up to top_k (record_id, similarity) pairs at or above threshold, best first."""
+        with self.lock:
+            if not self.size:
+                return []
+            matrix = self.matrix[:self.size]
+            labels = self.labels[:self.size]
+            ids = self.ids
+            rows = None
+            for column, value in ((0, vibe), (1, nature_of_answer)):
+                if value is None:
+                    continue
+                code = self.codes.get(value)
+                if code is None:
+                    return []
+                rows = labels[:, column] == code if rows is None else rows & (labels[:, column] == code)
+        
+        # Stored embeddings are unit-length, so one matrix-vector product gives the
+        # cosine similarity of every row; the label filter is applied to the scores
+        # rather than by gathering the matching rows into a (candidates, D) copy
+        similarities = matrix @ query_embedding
+        hits = similarities >= threshold
+        if rows is not None:
+            hits &= rows
+        
+        # Only rows passing both, then an O(N) partial selection; the k winners are sorted
+        above = np.flatnonzero(hits)
+        if not above.size:
+            return []
+        k = min(top_k, above.size)
+        top = above[np.argpartition(-similarities[above], k - 1)[:k]]
+        top = top[np.argsort(-similarities[top])]
+        return [(ids[i], float(similarities[i])) for i in top]
+
+def _connection_params() -> Dict[str, Any]:
+    """Client options shared by the sync and async MongoDB handlers."""
+    # Use the working connection settings from our test
+    connection_params = {
+        'tls': True,
+        'tlsCAFile': certifi.where(),
+        'retryWrites': True,
+        'w': 'majority',
+        'connectTimeoutMS': 10000,
+        'serverSelectionTimeoutMS': 10000,
+        'appname': 'BRIDGE-API',
+        # Pool sizing: keep a few warm connections for bursts of auth traffic, cap the
+        # total, and fail fast instead of queueing forever when the pool is exhausted
+        'maxPoolSize': int(os.getenv('MONGO_MAX_POOL', '200')),
+        'minPoolSize': int(os.getenv('MONGO_MIN_POOL', '10')),
+        # Connections opened in parallel per pool (driver default 2), so a burst after
+        # a restart doesn't queue behind TLS handshakes
+        'maxConnecting': int(os.getenv('MONGO_MAX_CONNECTING', '5')),
+        # Reap idle sockets before cloud load balancers silently drop them
+        'maxIdleTimeMS': int(os.getenv('MONGO_MAX_IDLE_MS', '60000')),
+        'waitQueueTimeoutMS': 2000,
+        'socketTimeoutMS': int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', '30000')),
+        # Wire compression, negotiated with the server in this order; codecs whose
+        # package isn't installed are skipped by the driver (zlib is always available)
+        'compressors': 'zstd,snappy,zlib',
+        'zlibCompressionLevel': 3
+    }
+    
+    if os.getenv('ENV', 'development') == 'development':
+        logger.warning("Running in development mode with relaxed SSL settings")
+        connection_params.update({
+            'tlsAllowInvalidCertificates': True,
+            'tlsAllowInvalidHostnames': True
+        })
+    
+    return connection_params
+
 class MongoDBHandler:
     """Handles MongoDB connection and operations."""
     
     _instance = None
+    _instance_lock = threading.Lock()
     _client = None
     _db = None
     
     def __new__(cls):
         """Singleton pattern to ensure only one instance exists."""
         if cls._instance is None:
-            cls._instance = super(MongoDBHandler, cls).__new__(cls)
-            cls._instance._initialize_connection()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    # Publish only a fully initialized handler; a failed connect leaves none cached
+                    instance = super(MongoDBHandler, cls).__new__(cls)
+                    instance._initialize_connection()
+                    cls._instance = instance
         return cls._instance
     
     def _initialize_connection(self):
@@ -91,45 +382,33 @@ class MongoDBHandler:
             raise ValueError("MONGO_URI environment variable is not set")
         
         self.db_name = os.getenv("MONGO_DB_NAME", "bridge_db")
+        self.vector_index = os.getenv("MONGO_VECTOR_INDEX")
+        self._embedding_index = _EmbeddingIndex()
+        self._qa_queue = queue.Queue()
+        self._qa_writer = None
+        self._qa_writer_lock = threading.Lock()
+        self._question_hashes_backfilled = False  # legacy text fallback in find_by_prompt until set
         
         for attempt in range(1, max_retries + 1):
             try:
-                logger.info(f"Attempting to connect to MongoDB at: {self.mongo_uri}")
+                logger.info("Attempting to connect to MongoDB at: %s", self.mongo_uri)
                 
-                # Use the working connection settings from our test
-                connection_params = {
-                    'tls': True,
-                    'tlsCAFile': certifi.where(),
-                    'retryWrites': True,
-                    'w': 'majority',
-                    'connectTimeoutMS': 10000,
-                    'serverSelectionTimeoutMS': 10000,
-                    'appname': 'BRIDGE-API'
-                }
-                
-                if os.getenv('ENV', 'development') == 'development':
-                    logger.warning("Running in development mode with relaxed SSL settings")
-                    connection_params.update({
-                        'tlsAllowInvalidCertificates': True,
-                        'tlsAllowInvalidHostnames': True
-                    })
-                
-                self._client = MongoClient(self.mongo_uri, **connection_params)
-                self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+                self._client = MongoClient(self.mongo_uri, **_connection_params())
                 
                 # Test the connection
                 self._client.admin.command('ping')
                 logger.info("Successfully connected to MongoDB")
                 self._db = self._client[self.db_name]
                 self._init_collections()
-                logger.info(f"Successfully initialized database '{self.db_name}'")
+                logger.info("Successfully initialized database '%s'", self.db_name)
+                atexit.register(self.disconnect)
                 return
                 
             except Exception as e:
                 error_msg = str(e)
-                logger.warning(f"Connection attempt {attempt} failed: {error_msg}")
+                logger.warning("Connection attempt %s failed: %s", attempt, error_msg)
                 if attempt < max_retries:
-                    logger.warning(f"Retrying in {retry_delay} seconds...")
+                    logger.warning("Retrying in %s seconds...", retry_delay)
                     time.sleep(retry_delay)
                 else:
                     logger.error("Failed to connect to MongoDB after 3 attempts: " + error_msg)
@@ -143,15 +422,30 @@ class MongoDBHandler:
     def _init_collections(self):
         """Initialize collections and indexes."""
         # Users collection
-        self.users = self._db["users"]
-        self.users.create_index("username", unique=True)
-        self.users.create_index("email", unique=True)
-        self.users.create_index("api_key", unique=True, sparse=True)
+        self.users = self._db.get_collection("users", codec_options=USER_CODEC_OPTIONS)
+        self._users_unacked = self.users.with_options(write_concern=WriteConcern(w=0))
+        self.users.create_indexes(USER_INDEXES)
         
         # QA records collection
-        self.qa_records = self._db["qa_records"]
-        self.qa_records.create_index("user_id")
-        self.qa_records.create_index([("timestamp", -1)])
+        self.qa_records = self._db.get_collection("qa_records", write_concern=QA_WRITE_CONCERN)
+        # Per-user history: equality on user_id and the timestamp sort from one index
+        self.qa_records.create_index([("user_id", 1), ("timestamp", -1)], name="user_time")
+        # Dashboard date-window queries, optionally narrowed to one model (its
+        # timestamp prefix also serves plain time-ordered scans)
+        self.qa_records.create_index([("timestamp", -1), ("metadata.model", 1)])
+        # Exact-match cache lookups: a point lookup on a short hash instead of the full text
+        self.qa_records.create_index([("question_hash", 1), ("vibe", 1), ("nature_of_answer", 1)])
+    
+    @property
+    def embedding_model(self) -> SentenceTransformer:
+        """The shared embedding model (see get_embedding_model)."""
+        return get_embedding_model()
+    
+    def disconnect(self):
+        """Close the client and its connection pool; registered to run at interpreter exit."""
+        if self._client is not None:
+            self._client.close()
+            logger.info("MongoDB connection closed")
     
     def test_connection(self):
         """Test MongoDB connection and collection access."""
@@ -173,43 +467,22 @@ class MongoDBHandler:
             raise
     
     # User management methods
-    def create_user(self, username: str, email: str, password: str) -> Dict[str, Any]:
+    def create_user(self, username: str, email: str, password: str, user_type: str = "user") -> Dict[str, Any]:
         """
         Create a new user in the users collection.
         :param username: chosen username
         :param password: plain text password (should be hashed)
-        :param role: one of ['user', 'agent', 'admin']
+        :param user_type: one of ['user', 'agent', 'admin']
         :return: user_id (str)
         """ 
         try:
-            print("👤 [MongoHandler] Creating user...")
-            print(f"📝 username: {username}")
-            print(f"🔐 password: {password}")
-            
-            # Check if user already exists
-            if self.users.find_one({"$or": [{"username": username}, {"email": email}]}):
-                raise ValueError("Username or email already exists")
-            
-            # Hash password
-            from passlib.hash import bcrypt
-            hashed_password = bcrypt.using(rounds=12).hash(password)
-            
-            # Generate API key
-            import secrets
-            api_key = f"brdg_{secrets.token_urlsafe(32)}"
-            
-            # Create user document
-            user = {
-                "username": username,
-                "email": email,
-                "hashed_password": hashed_password,
-                "api_key": api_key,
-                "is_active": True,
-                "created_at": datetime.datetime.utcnow(),
-                "last_login": None
-            }
+            logger.debug("Creating user %s", username)
+            
+            # Hash password (argon2id, shared context with the API layer)
+            user = _new_user_document(username, email, hash_password(password), user_type)
             
-            # Insert user
+            # Insert user; the unique indexes on username and email reject duplicates
+            # in the same round-trip, with no window between a check and the insert
             result = self.users.insert_one(user)
             user["id"] = str(result.inserted_id)
             
@@ -219,10 +492,10 @@ class MongoDBHandler:
             
             return user
             
-        except DuplicateKeyError:
-            raise ValueError("Username or email already exists")
+        except DuplicateKeyError as e:
+            raise _duplicate_user_error(e)
         except PyMongoError as e:
-            logger.error(f"Error creating user: {e}")
+            logger.error("Error creating user: %s", e)
             raise
     
     def verify_user(self, username: str, password: str) -> Optional[Dict[str, Any]]:
@@ -233,19 +506,17 @@ class MongoDBHandler:
         :return: user document if verification is successful, None otherwise
         """
         try:
-            user = self.users.find_one({"username": username, "is_active": True})
+            user = self.users.find_one({"username": username, "is_active": True}, projection=VERIFY_USER_PROJECTION)
             if not user:
+                # Spend the same hashing time as a wrong password so usernames can't be probed by timing
+                verify_dummy_password(password)
                 return None
                 
-            from passlib.hash import bcrypt
-            if not bcrypt.verify(password, user["hashed_password"]):
+            if not verify_password(password, user["hashed_password"]):
                 return None
                 
             # Update last login
-            self.users.update_one(
-                {"_id": user["_id"]},
-                {"$set": {"last_login": datetime.datetime.utcnow()}}
-            )
+            self.update_user_unacked(user["_id"], {"last_login": datetime.datetime.now(datetime.timezone.utc)})
             
             # Prepare user data to return
             user_data = {
@@ -259,7 +530,7 @@ class MongoDBHandler:
             return user_data
             
         except PyMongoError as e:
-            logger.error(f"Error verifying user: {e}")
+            logger.error("Error verifying user: %s", e)
             raise
     
     def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
@@ -269,21 +540,13 @@ class MongoDBHandler:
         :return: user document if found, None otherwise
         """
         try:
-            user = self.users.find_one({"_id": ObjectId(user_id), "is_active": True})
-            if not user:
-                return None
-                
-            return {
-                "id": str(user["_id"]),
-                "username": user["username"],
-                "email": user["email"],
-                "is_active": user.get("is_active", True),
-                "created_at": user.get("created_at"),
-                "last_login": user.get("last_login")
-            }
+            return self.users.find_one(
+                {"_id": ObjectId(user_id), "is_active": True},
+                projection=PUBLIC_USER_PROJECTION
+            )
             
         except PyMongoError as e:
-            logger.error(f"Error getting user: {e}")
+            logger.error("Error getting user: %s", e)
             raise
     
     def rotate_api_key(self, user_id: str) -> Optional[str]:
@@ -293,7 +556,6 @@ class MongoDBHandler:
         :return: new API key if rotation is successful, None otherwise
         """
         try:
-            import secrets
             new_api_key = f"brdg_{secrets.token_urlsafe(32)}"
             
             result = self.users.update_one(
@@ -307,7 +569,7 @@ class MongoDBHandler:
             return new_api_key
             
         except PyMongoError as e:
-            logger.error(f"Error rotating API key: {e}")
+            logger.error("Error rotating API key: %s", e)
             raise
     
     def update_user(self, user_id: str, update_data: Dict[str, Any]) -> bool:
@@ -322,8 +584,6 @@ class MongoDBHandler:
             bool: True if update was successful, False otherwise
         """
         try:
-            from bson import ObjectId
-            
             # Convert string ID to ObjectId if needed
             if isinstance(user_id, str):
                 user_id = ObjectId(user_id)
@@ -339,9 +599,27 @@ class MongoDBHandler:
             return result.modified_count > 0
             
         except Exception as e:
-            logger.error(f"Error updating user {user_id}: {e}")
+            logger.error("Error updating user %s: %s", user_id, e)
             return False
     
+    def update_user_unacked(self, user_id, update_data: Dict[str, Any]) -> None:
+        """
+        Update low-value user fields (e.g. last_login) without waiting for an acknowledgement.
+        
+        The write is sent with w=0, so the caller doesn't pay the ack round-trip; losing
+        it on a primary failover is acceptable for telemetry-style fields.
+        
+        Args:
+            user_id: The ID of the user to update (str or ObjectId)
+            update_data: Dictionary of fields to set
+        """
+        try:
+            if isinstance(user_id, str):
+                user_id = ObjectId(user_id)
+            self._users_unacked.update_one({"_id": user_id}, {"$set": update_data})
+        except Exception as e:
+            logger.error("Error updating user %s: %s", user_id, e)
+    
     # QA Records methods
     def save_qa_record(self, user_id: str, question: str, answer: str, metadata: Optional[Dict] = None, 
                    vibe: Optional[str] = None, nature_of_answer: Optional[str] = None) -> str:
@@ -358,63 +636,270 @@ class MongoDBHandler:
             str: The ID of the saved QA record
         """
         try:
-            # Debug: Check if json module is available
-            try:
-                import json
-                print("✅ json module is available")
-            except ImportError as e:
-                print(f"❌ json module import error: {e}")
-                raise
-
-            print(f"🔍 [MongoDB] Attempting to save QA record for user: {user_id}")
-            print(f"📝 Question: {question[:100]}..." if len(question) > 100 else f"📝 Question: {question}")
-            print(f"📝 Answer: {answer[:100]}..." if len(answer) > 100 else f"📝 Answer: {answer}")
-            
-            # Safely convert metadata to string for logging
-            try:
-                metadata_str = json.dumps(metadata, default=str) if metadata is not None else 'None'
-                print(f"📦 Metadata: {metadata_str}")
-            except Exception as e:
-                print(f"⚠️ Could not serialize metadata: {e}")
-                metadata_str = str(metadata)
+            logger.debug("Saving QA record for user %s: %.100s", user_id, question)
+            if logger.isEnabledFor(logging.DEBUG):
+                # Only walk the metadata when someone reads the output
+                logger.debug("QA record metadata: %s", json.dumps(metadata, default=str))
             
             if not hasattr(self, 'qa_records') or self.qa_records is None:
-                print("⚠️ [MongoDB] qa_records collection is not initialized!")
+                logger.warning("qa_records collection is not initialized")
                 return None
                 
-            record = {
-                'user_id': user_id,
-                'question': question,
-                'answer': answer,
-                'vibe': vibe,
-                'nature_of_answer': nature_of_answer,
-                'metadata': metadata or {},
-                'timestamp': datetime.datetime.utcnow(),
-                'version': '2.1'
-            }
+            metadata = dict(metadata or {})
+            embedding = metadata.pop('embedding', None)
+            if embedding is None:
+                # Usually a cache hit: the question was just encoded by the search
+                embedding = _query_embedding(self.embedding_model, question)
+            record = self._build_qa_record(user_id, question, answer, metadata, vibe, nature_of_answer, embedding)
             
-            print("📡 [MongoDB] Inserting record into database...")
             result = self.qa_records.insert_one(record)
             
             if result and result.inserted_id:
-                print(f"✅ [MongoDB] Successfully saved QA record with ID: {result.inserted_id}")
+                self._index_embeddings([result.inserted_id], [record])
+                logger.debug("Saved QA record %s", result.inserted_id)
                 return str(result.inserted_id)
             else:
-                print("⚠️ [MongoDB] Insert operation completed but no inserted_id was returned!")
+                logger.warning("QA record insert returned no inserted_id")
                 return None
             
         except PyMongoError as e:
-            error_msg = f"❌ [MongoDB] Error saving QA record: {str(e)}"
-            print(error_msg)
-            logger.error(error_msg)
+            logger.error("Error saving QA record: %s", e)
             raise
         except Exception as e:
-            error_msg = f"❌ [MongoDB] Unexpected error in save_qa_record: {str(e)}"
-            print(error_msg)
-            logger.error(error_msg, exc_info=True)
+            logger.error("Unexpected error in save_qa_record: %s", e, exc_info=True)
+            raise
+    
+    def save_qa_records(self, records: List[Dict[str, Any]]) -> List[str]:
+        """
+        Save several QA records with one batched encode and a single insert_many.
+        
+        Args:
+            records: Dicts holding the save_qa_record arguments (user_id, question,
+                answer and, optionally, metadata, vibe and nature_of_answer)
+            
+        Returns:
+            List[str]: The IDs of the saved QA records
+        """
+        if not records:
+            return []
+        
+        metadatas = [dict(record.get('metadata') or {}) for record in records]
+        embeddings = [metadata.pop('embedding', None) for metadata in metadatas]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            # Given a list, sentence-transformers sorts by length and pads per batch
+            with torch.inference_mode():
+                encoded = self.embedding_model.encode(
+                    [records[i]['question'] for i in missing],
+                    batch_size=64,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False
+                )
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+        
+        documents = [
+            self._build_qa_record(
+                record['user_id'], record['question'], record['answer'], metadata,
+                record.get('vibe'), record.get('nature_of_answer'), embedding
+            )
+            for record, metadata, embedding in zip(records, metadatas, embeddings)
+        ]
+        try:
+            result = self.qa_records.insert_many(documents, ordered=False)
+            self._index_embeddings(result.inserted_ids, documents)
+            return [str(inserted_id) for inserted_id in result.inserted_ids]
+        except PyMongoError as e:
+            logger.error("Error saving QA records: %s", e)
             raise
     
-    def get_user_qa_history(self, user_id: str, limit: int = 10, skip: int = 0) -> List[Dict]:
+    def enqueue_qa_record(self, user_id: str, question: str, answer: str, metadata: Optional[Dict] = None,
+                          vibe: Optional[str] = None, nature_of_answer: Optional[str] = None) -> None:
+        """
+        Queue a QA record to be saved in the background.
+        
+        The caller returns without waiting on the embedding or the insert; queued
+        records are written in batches through save_qa_records. Takes the same
+        arguments as save_qa_record.
+        """
+        if self._qa_writer is None:
+            with self._qa_writer_lock:
+                if self._qa_writer is None:
+                    self._qa_writer = threading.Thread(target=self._qa_writer_loop, name="qa-writer", daemon=True)
+                    self._qa_writer.start()
+                    # Runs before disconnect (atexit is LIFO), so queued records aren't lost
+                    atexit.register(self.flush_qa_records)
+        self._qa_queue.put({
+            'user_id': user_id,
+            'question': question,
+            'answer': answer,
+            'metadata': metadata,
+            'vibe': vibe,
+            'nature_of_answer': nature_of_answer
+        })
+    
+    def flush_qa_records(self):
+        """Block until every queued QA record has been written (or failed and been logged)."""
+        self._qa_queue.join()
+    
+    def _qa_writer_loop(self):
+        """Drain the QA queue in batches for the lifetime of the process."""
+        while True:
+            batch = [self._qa_queue.get()]
+            deadline = time.monotonic() + QA_WRITE_INTERVAL
+            while len(batch) < QA_WRITE_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._qa_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self.save_qa_records(batch)
+            except Exception as e:
+                logger.error("Background save of %s QA records failed: %s", len(batch), e)
+            finally:
+                for _ in batch:
+                    self._qa_queue.task_done()
+    
+    @staticmethod
+    def _build_qa_record(user_id, question, answer, metadata, vibe, nature_of_answer, embedding) -> Dict[str, Any]:
+        """Assemble a qa_records document; metadata must already be stripped of its embedding."""
+        # The embedding is stored once, unit-length, at the top level so semantic
+        # search can score records with a plain dot product
+        embedding = _unit_vector(embedding)
+        return {
+            'user_id': user_id,
+            'question': question,
+            'question_hash': _question_hash(question),
+            'answer': answer,
+            'vibe': vibe,
+            'nature_of_answer': nature_of_answer,
+            'metadata': metadata,
+            'embedding': embedding.tolist(),
+            'embedding_i8': _quantize_embedding(embedding),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc),
+            'version': '2.1'
+        }
+    
+    def _index_embeddings(self, record_ids: list, records: List[Dict[str, Any]]):
+        """Add freshly saved records to the in-memory embedding index, if it is loaded."""
+        if self._embedding_index.loaded_at is not None:
+            self._embedding_index.extend(
+                record_ids,
+                np.stack([_stored_embedding(record['embedding_i8']) for record in records]),
+                [record.get('vibe') for record in records],
+                [record.get('nature_of_answer') for record in records]
+            )
+    
+    def _load_embedding_index(self) -> _EmbeddingIndex:
+        """Return the embedding index, reloading it from qa_records when stale."""
+        index = self._embedding_index
+        with index.lock:
+            if index.is_stale():
+                cursor = self.qa_records.aggregate([
+                    {"$match": {"embedding": {"$ne": None}}},
+                    {"$project": {
+                        "vector": {"$ifNull": ["$embedding_i8", "$embedding"]},
+                        "vibe": 1,
+                        "nature_of_answer": 1
+                    }}
+                ], batchSize=1000)
+                ids, vectors, vibes, natures = [], [], [], []
+                for doc in cursor:
+                    if len(doc["vector"]):
+                        ids.append(doc["_id"])
+                        vectors.append(_stored_embedding(doc["vector"]))
+                        vibes.append(doc.get("vibe"))
+                        natures.append(doc.get("nature_of_answer"))
+                index.reset()
+                if ids:
+                    index.extend(ids, np.stack(vectors), vibes, natures)
+                logger.info("Loaded %s embeddings into the semantic search index", index.size)
+        return index
+    
+    def normalize_stored_embeddings(self, batch_size: int = 500) -> int:
+        """
+        One-time backfill: rescale embeddings saved before they were stored unit-length
+        and add the int8 copy to records that lack it.
+        
+        Only records without embedding_i8 are read, so once the backfill has run a
+        repeat call (the API runs it on every startup) matches nothing and writes nothing.
+        
+        Args:
+            batch_size: Number of updates sent per bulk write
+            
+        Returns:
+            int: The number of records rewritten
+        """
+        updated = 0
+        batch = []
+        cursor = self.qa_records.find(
+            {"embedding": {"$ne": None}, "embedding_i8": {"$exists": False}},
+            projection={"embedding": 1}
+        )
+        for record in cursor:
+            vector = np.asarray(record["embedding"], dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            if norm == 0:
+                continue
+            vector = vector / norm
+            batch.append(UpdateOne({"_id": record["_id"]}, {"$set": {
+                "embedding": vector.tolist(),
+                "embedding_i8": _quantize_embedding(vector)
+            }}))
+            if len(batch) >= batch_size:
+                updated += self.qa_records.bulk_write(batch, ordered=False).modified_count
+                batch = []
+        if batch:
+            updated += self.qa_records.bulk_write(batch, ordered=False).modified_count
+        if updated:
+            self._embedding_index.invalidate()
+        logger.info("Normalized %s stored embeddings", updated)
+        return updated
+    
+    def backfill_question_hashes(self, batch_size: int = 500) -> int:
+        """
+        One-time migration for exact-match lookups on question_hash.
+        
+        Copies metadata.question into question where only the former was written,
+        then adds question_hash to every record that lacks it.
+        
+        Args:
+            batch_size: Number of updates sent per bulk write
+            
+        Returns:
+            int: The number of records given a question_hash
+        """
+        self.qa_records.update_many(
+            {"question": {"$exists": False}, "metadata.question": {"$exists": True}},
+            [{"$set": {"question": "$metadata.question"}}]
+        )
+        
+        updated = 0
+        batch = []
+        cursor = self.qa_records.find(
+            {"question_hash": {"$exists": False}, "question": {"$type": "string"}},
+            projection={"question": 1}
+        )
+        for record in cursor:
+            batch.append(UpdateOne(
+                {"_id": record["_id"]},
+                {"$set": {"question_hash": _question_hash(record["question"])}}
+            ))
+            if len(batch) >= batch_size:
+                updated += self.qa_records.bulk_write(batch, ordered=False).modified_count
+                batch = []
+        if batch:
+            updated += self.qa_records.bulk_write(batch, ordered=False).modified_count
+        self._question_hashes_backfilled = True
+        logger.info("Added question_hash to %s QA records", updated)
+        return updated
+    
+    def get_user_qa_history(self, user_id: str, limit: int = 10, skip: int = 0,
+                            before: Optional[datetime.datetime] = None) -> List[Dict]:
         """  
         Get QA history for a user.
         
@@ -422,12 +907,18 @@ class MongoDBHandler:
             user_id: The ID of the user to retrieve QA history for
             limit: The maximum number of records to retrieve
             skip: The number of records to skip
+            before: Only return records older than this timestamp; pass the last
+                timestamp of the previous page to paginate without walking skipped
+                index entries
             
         Returns:
             List[Dict]: A list of QA records for the user
         """
         try:
-            cursor = self.qa_records.find({"user_id": user_id})\
+            query = {"user_id": user_id}
+            if before is not None:
+                query["timestamp"] = {"$lt": before}
+            cursor = self.qa_records.find(query, projection=QA_HISTORY_PROJECTION)\
                                  .sort("timestamp", -1)\
                                  .skip(skip)\
                                  .limit(limit)
@@ -441,7 +932,7 @@ class MongoDBHandler:
             } for record in cursor]
             
         except PyMongoError as e:
-            logger.error(f"❌ Error getting QA history: {e}")
+            logger.error("❌ Error getting QA history: %s", e)
             raise
 
     def find_by_prompt(self, prompt_text, vibe=None, nature_of_answer=None):
@@ -450,38 +941,39 @@ class MongoDBHandler:
             if self.qa_records is None:  # Proper None check for collection
                 return None
         
-            # Build query conditions
-            query_conditions = {
-                "$or": [
-                    {"question": prompt_text},
-                    {"metadata.question": prompt_text}
-                ]
-            }
-        
-            # Add vibe filter if provided
+            # Optional vibe and nature_of_answer filters
+            filters = {}
             if vibe is not None:
-                query_conditions["vibe"] = vibe
-        
-            # Add nature_of_answer filter if provided  
+                filters["vibe"] = vibe
             if nature_of_answer is not None:
-                query_conditions["nature_of_answer"] = nature_of_answer
+                filters["nature_of_answer"] = nature_of_answer
         
-            print(f"🔍 [MongoDB] Searching with query: {query_conditions}")
-        
-            result = self.qa_records.find_one(query_conditions)
+            # Equality lookup on the indexed question hash (see backfill_question_hashes)
+            result = self.qa_records.find_one({"question_hash": _question_hash(prompt_text), **filters})
+            
+            if result is None and not self._question_hashes_backfilled:
+                # Records saved before question_hash existed only match on the text
+                query_conditions = {
+                    "$or": [
+                        {"question": prompt_text},
+                        {"metadata.question": prompt_text}
+                    ],
+                    "question_hash": {"$exists": False},
+                    **filters
+                }
+                logger.debug("Exact match by text: %s", query_conditions)
+                result = self.qa_records.find_one(query_conditions)
         
             if result and '_id' in result:
                 result['_id'] = str(result['_id'])
-                print(f"✅ [MongoDB] Exact match found with vibe='{vibe}' and nature_of_answer='{nature_of_answer}'")
+                logger.debug("Exact match found (vibe=%s, nature_of_answer=%s)", vibe, nature_of_answer)
                 return result
         
-            print(f"❌ [MongoDB] No exact match found with the specified parameters")
+            logger.debug("No exact match found")
             return None
         
         except Exception as e:
-            print(f"❌ [MongoDB] Error finding prompt: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Error finding prompt: %s", e, exc_info=True)
             return None
 
     def semantic_search_by_prompt(self, query, vibe=None, nature_of_answer=None, threshold=0.85, top_k=1):
@@ -498,12 +990,16 @@ class MongoDBHandler:
         Returns:
             List[Dict]: A list of QA records matching the query
         """
-        print("\n--- MongoDBHandler.semantic_search_by_prompt ---")
+        matches = self._semantic_matches(query, vibe, nature_of_answer, threshold, top_k)
+        return [record for record, _ in matches]
+
+    def _semantic_matches(self, query, vibe, nature_of_answer, threshold, top_k):
+        """Return up to top_k (record, similarity) pairs at or above threshold, best first."""
         try:
-            query_embedding = self.embedding_model.encode(query).reshape(1, -1)
+            query_embedding = _query_embedding(self.embedding_model, query)
 
             # Build MongoDB filter
-            mongo_filter = {"embedding": {"$ne": None}}
+            mongo_filter = {}
         
             # Add vibe filter if provided
             if vibe is not None:
@@ -513,30 +1009,52 @@ class MongoDBHandler:
             if nature_of_answer is not None:
                 mongo_filter["nature_of_answer"] = nature_of_answer
         
-            print(f"🔍 [MongoDB] Semantic search filter: {mongo_filter}")
-
-            # Fetch filtered records with non-null embeddings
-            records = list(self.qa_records.find(mongo_filter))
-            print(f"📊 [MongoDB] Found {len(records)} records matching filters")
-
-            similarities = []
-            for rec in records:
-                emb = rec.get('embedding')
-                if emb:
-                    sim = cosine_similarity([emb], query_embedding)[0][0]
-                    similarities.append((rec, sim))
-
-            # Sort by similarity
-            sorted_results = sorted(similarities, key=lambda x: x[1], reverse=True)
-            filtered = [r for r in sorted_results if r[1] >= threshold]
+            if self.vector_index:
+                try:
+                    return self._vector_search_matches(query_embedding, mongo_filter, threshold, top_k)
+                except OperationFailure as e:
+                    # Not on Atlas, or the index is unusable: scan in-process from now on
+                    logger.warning("$vectorSearch failed, falling back to in-process scan: %s", e)
+                    self.vector_index = None
+            
+            logger.debug("Semantic search filter: %s", mongo_filter)
 
-            print(f"🔍 Found {len(filtered)} matching records above threshold {threshold}")
-            return [r[0] for r in filtered[:top_k]]
+            # Score against the in-memory embedding index; full documents are loaded
+            # for the winners alone
+            best = self._load_embedding_index().search(query_embedding, vibe, nature_of_answer, threshold, top_k)
+            logger.debug("Found %s records above threshold %s", len(best), threshold)
+            if not best:
+                return []
+            by_id = {rec["_id"]: rec for rec in self.qa_records.find({"_id": {"$in": [i for i, _ in best]}})}
+            return [(by_id[record_id], similarity) for record_id, similarity in best if record_id in by_id]
 
         except Exception as e:
-            print(f"❌ Error in semantic_search_by_prompt: {str(e)}")
+            logger.error("Error in semantic search: %s", e)
             return []
 
+    def _vector_search_matches(self, query_embedding, mongo_filter, threshold, top_k):
+        """Run the similarity search server-side with Atlas $vectorSearch."""
+        vector_search = {
+            "index": self.vector_index,
+            "path": "embedding",
+            "queryVector": query_embedding.tolist(),
+            "numCandidates": max(100, top_k * 20),
+            "limit": top_k
+        }
+        if mongo_filter:
+            vector_search["filter"] = mongo_filter
+        
+        # Atlas reports dotProduct/cosine scores as (1 + similarity) / 2
+        pipeline = [
+            {"$vectorSearch": vector_search},
+            {"$set": {"_score": {"$meta": "vectorSearchScore"}}},
+            {"$match": {"_score": {"$gte": (1 + threshold) / 2}}}
+        ]
+        matches = []
+        for record in self.qa_records.aggregate(pipeline):
+            matches.append((record, 2 * record.pop("_score") - 1))
+        logger.debug("$vectorSearch returned %s records above threshold %s", len(matches), threshold)
+        return matches
     
     def search(self, prompt, vibe=None, nature_of_answer=None, threshold=0.85):
         """
@@ -554,35 +1072,197 @@ class MongoDBHandler:
                 - The match type ('exact', 'semantic', or 'not_found')
                 - The similarity score (1.0 for exact matches, 0.0 for no match)
         """
-        print("\n--- MongoDBHandler.search ---")
-        print(f"🔎 Searching MongoDB for: {prompt[:50]}...")
+        logger.debug("Searching MongoDB for: %.50s", prompt)
 
         # Try exact match first
         exact_match = self.find_by_prompt(prompt, vibe=vibe, nature_of_answer=nature_of_answer)
         if exact_match:
-            print("✅ Exact match found in MongoDB")
+            logger.debug("Exact match found in MongoDB")
             return exact_match, 'exact', 1.0
 
-        # Fallback to semantic search
-        semantic_results = self.semantic_search_by_prompt(
-            prompt, 
-            vibe=vibe, 
-            nature_of_answer=nature_of_answer, 
-            threshold=threshold
-        )
+        # Fallback to semantic search; the score comes back with the match, so the
+        # prompt is encoded only once
+        semantic_results = self._semantic_matches(prompt, vibe, nature_of_answer, threshold, 1)
     
         if semantic_results:
-            best_match = semantic_results[0]
-            # Get the similarity score from the semantic search
-            query_embedding = self.embedding_model.encode(prompt).reshape(1, -1)
-            result_embedding = np.array(best_match.get('embedding', [])).reshape(1, -1)
-            similarity = float(cosine_similarity(query_embedding, result_embedding)[0][0])
+            best_match, similarity = semantic_results[0]
         
-            print(f"✅ Semantic match found in MongoDB (similarity: {similarity:.2f})")
+            logger.debug("Semantic match found in MongoDB (similarity: %.2f)", similarity)
             return best_match, 'semantic', similarity
 
-        print("❌ No match found in MongoDB")
+        logger.debug("No match found in MongoDB")
         return None, 'not_found', 0.0
 
-# Create a singleton instance
-db_handler = MongoDBHandler()   
+class AsyncMongoDBHandler:
+    """
+    Async (Motor) access to the same database for the FastAPI request path.
+    
+    MongoDBHandler stays the owner of startup work (ping, index creation, embedding
+    model); this handler only exposes the collections and the user operations that
+    run inside request coroutines, so a MongoDB round-trip no longer stalls the event loop.
+    """
+    
+    _instance = None
+    _instance_lock = threading.Lock()
+    
+    def __new__(cls):
+        """Singleton pattern to ensure only one instance exists."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    # Publish only a fully initialized handler; a failed connect leaves none cached
+                    instance = super(AsyncMongoDBHandler, cls).__new__(cls)
+                    instance._initialize_connection()
+                    cls._instance = instance
+        return cls._instance
+    
+    def _initialize_connection(self):
+        """Create the Motor client; connections are opened lazily on first use."""
+        self.mongo_uri = os.getenv("MONGO_URI")
+        if not self.mongo_uri:
+            logger.error("MONGO_URI environment variable is not set")
+            raise ValueError("MONGO_URI environment variable is not set")
+        
+        self.db_name = os.getenv("MONGO_DB_NAME", "bridge_db")
+        
+        # Sized separately from the sync client: only request-path user operations
+        # run here, so it keeps few warm connections next to the sync pool
+        connection_params = _connection_params()
+        connection_params.update({
+            'maxPoolSize': int(os.getenv('MONGO_ASYNC_MAX_POOL', '100')),
+            'minPoolSize': int(os.getenv('MONGO_ASYNC_MIN_POOL', '2'))
+        })
+        
+        self._client = AsyncIOMotorClient(self.mongo_uri, **connection_params)
+        self._db = self._client[self.db_name]
+        self.users = self._db.get_collection("users", codec_options=USER_CODEC_OPTIONS)
+        self._users_unacked = self.users.with_options(write_concern=WriteConcern(w=0))
+        self.qa_records = self._db.get_collection("qa_records", write_concern=QA_WRITE_CONCERN)
+        self._indexes_ready = False
+    
+    async def ensure_indexes(self):
+        """Create the unique user indexes if they don't exist yet; cheap once they do."""
+        if not self._indexes_ready:
+            await self.users.create_indexes(USER_INDEXES)
+            self._indexes_ready = True
+    
+    def disconnect(self):
+        """Close the Motor client and its connection pool; called on API shutdown."""
+        self._client.close()
+        logger.info("Async MongoDB connection closed")
+    
+    async def create_user(self, username: str, email: str, password: str, user_type: str = "user") -> Dict[str, Any]:
+        """
+        Create a new user in the users collection.
+        
+        The password is hashed on the dedicated hashing pool and the insert is
+        awaited on the event loop, so no worker thread waits on MongoDB.
+        :param username: chosen username
+        :param password: plain text password
+        :param user_type: one of ['user', 'agent', 'admin']
+        :return: the created user, without the password hash
+        """
+        try:
+            logger.debug("Creating user %s", username)
+            user = _new_user_document(username, email, await run_in_hash_pool(hash_password, password), user_type)
+            
+            # Duplicates are only detected once the unique indexes exist
+            await self.ensure_indexes()
+            result = await self.users.insert_one(user)
+            user["id"] = str(result.inserted_id)
+            
+            # Don't return sensitive data
+            user.pop("hashed_password", None)
+            user.pop("_id", None)
+            
+            return user
+            
+        except DuplicateKeyError as e:
+            raise _duplicate_user_error(e)
+        except PyMongoError as e:
+            logger.error("Error creating user: %s", e)
+            raise
+    
+    async def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get user by ID.
+        :param user_id: ID of the user to retrieve
+        :return: user document if found, None otherwise
+        """
+        try:
+            return await self.users.find_one(
+                {"_id": ObjectId(user_id), "is_active": True},
+                projection=PUBLIC_USER_PROJECTION
+            )
+            
+        except PyMongoError as e:
+            logger.error("Error getting user: %s", e)
+            raise
+    
+    async def update_user(self, user_id: str, update_data: Dict[str, Any]) -> bool:
+        """ 
+        Update user data.
+        
+        Args:
+            user_id: The ID of the user to update
+            update_data: Dictionary of fields to update
+            
+        Returns:
+            bool: True if update was successful, False otherwise
+        """
+        try:
+            # Convert string ID to ObjectId if needed
+            if isinstance(user_id, str):
+                user_id = ObjectId(user_id)
+                
+            # Don't allow updating _id
+            update_data.pop('_id', None)
+            
+            result = await self.users.update_one(
+                {"_id": user_id},
+                {"$set": update_data}
+            )
+            
+            return result.modified_count > 0
+            
+        except Exception as e:
+            logger.error("Error updating user %s: %s", user_id, e)
+            return False
+    
+    async def update_user_unacked(self, user_id, update_data: Dict[str, Any]) -> None:
+        """
+        Update low-value user fields (e.g. last_login) without waiting for an acknowledgement.
+        
+        Args:
+            user_id: The ID of the user to update (str or ObjectId)
+            update_data: Dictionary of fields to set
+        """
+        try:
+            if isinstance(user_id, str):
+                user_id = ObjectId(user_id)
+            await self._users_unacked.update_one({"_id": user_id}, {"$set": update_data})
+        except Exception as e:
+            logger.error("Error updating user %s: %s", user_id, e)
+
+def get_db_handler() -> MongoDBHandler:
+    """Return the shared sync handler; the connection is made on the first call."""
+    return MongoDBHandler()
+
+def get_async_db_handler() -> AsyncMongoDBHandler:
+    """Return the shared async (Motor) handler, created on the first call."""
+    return AsyncMongoDBHandler()
+
+def close_async_db_handler():
+    """Close the async handler's client if one was created; a no-op otherwise."""
+    with AsyncMongoDBHandler._instance_lock:
+        instance, AsyncMongoDBHandler._instance = AsyncMongoDBHandler._instance, None
+    if instance is not None:
+        instance.disconnect()
+
+def __getattr__(name: str):
+    """Keep `from data_layer.mongoHandler import db_handler` working, but lazily."""
+    if name == "db_handler":
+        return get_db_handler()
+    if name == "async_db_handler":
+        return get_async_db_handler()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")   
@@ -16,6 +16,32 @@ Key Features:
 - Support for different response types
 """
 
+import re
+from dataclasses import dataclass
+
+@dataclass
+class _EvalCtx:
+    """Per-answer state shared by the _assess_* helpers so the answer is scanned once"""
+    answer_lower: str
+    word_count: int
+    negative_hits: set
+    positive_hits: set
+    specificity_hits: set
+
+def _indicator_pattern(indicators):
+    """
+    Compile indicators into one pattern that reports every occurrence in a single scan.
+    
+    The lookahead makes matches zero-width, so overlapping indicators are all found;
+    at a given position only one alternative is reported, so no indicator in a
+    group may be a prefix of another.
+    """
+    return re.compile("(?=(" + "|".join(re.escape(indicator) for indicator in indicators) + "))")
+
+def _found_indicators(pattern, text):
+    """Return the set of distinct indicators the pattern finds in text."""
+    return {match.group(1) for match in pattern.finditer(text)}
+
 class AnswerEvaluator:
     """
     Evaluates the quality of LLM-generated responses and determines if upgrades are needed.
@@ -46,6 +72,24 @@ class AnswerEvaluator:
             }
         }
         
+        # Look for specific details, examples, numbers
+        self.specificity_indicators = [
+            'for example', 'specifically', 'such as', 'including',
+            'step 1', 'step 2', 'first', 'second', 'third',
+            'percent', '%', 'number', 'amount'
+        ]
+        
+        # One precompiled scan per indicator group instead of a substring search per indicator
+        self._negative_pattern = _indicator_pattern(
+            [indicator for indicators in self.quality_indicators['negative'].values() for indicator in indicators]
+        )
+        self._positive_pattern = _indicator_pattern(
+            [indicator for indicators in self.quality_indicators['positive'].values() for indicator in indicators]
+        )
+        self._specificity_pattern = _indicator_pattern(self.specificity_indicators)
+        self._confidence_indicators = frozenset(self.quality_indicators['positive']['confidence'])
+        self._uncertainty_indicators = frozenset(self.quality_indicators['negative']['uncertainty'])
+        
         # Quality assessment thresholds
         self.thresholds = {
             'minimum_length': 20,  # words
@@ -69,7 +113,7 @@ class AnswerEvaluator:
         llm_used = response_obj.get('llm_used') or response_obj.get('model_metadata', {}).get('llm_used', 'unknown')
         
         # Calculate quality components
-        quality_components = self._calculate_quality_components(answer, original_prompt)
+        quality_components, word_count = self._calculate_quality_components(answer, original_prompt)
         
         # Combine components into overall quality score
         overall_quality = self._calculate_overall_quality(quality_components, response_obj)
@@ -77,51 +121,52 @@ class AnswerEvaluator:
         # Determine if upgrade is needed
         needs_upgrade = self._should_upgrade(overall_quality, llm_used)
         
+        can_upgrade = self._can_upgrade(llm_used)
+        
         return {
             'quality': overall_quality,
             'needs_upgrade': needs_upgrade,
             'quality_breakdown': quality_components,
             'evaluation_details': {
                 'llm_used': llm_used,
-                'can_upgrade': self._can_upgrade(llm_used),
-                'upgrade_available': self._can_upgrade(llm_used)
+                'word_count': word_count,
+                'can_upgrade': can_upgrade,
+                'upgrade_available': can_upgrade
             }
         }
 
     def _calculate_quality_components(self, answer, original_prompt):
         """Calculate individual quality components"""
         answer_lower = answer.lower()
-        word_count = len(answer.split())
+        ctx = _EvalCtx(
+            answer_lower=answer_lower,
+            word_count=len(answer.split()),
+            negative_hits=_found_indicators(self._negative_pattern, answer_lower),
+            positive_hits=_found_indicators(self._positive_pattern, answer_lower),
+            specificity_hits=_found_indicators(self._specificity_pattern, answer_lower)
+        )
         
         components = {
-            'content_quality': self._assess_content_quality(answer_lower),
-            'length_adequacy': self._assess_length_adequacy(word_count),
-            'specificity': self._assess_specificity(answer_lower),
-            'confidence_level': self._assess_confidence_level(answer_lower)
+            'content_quality': self._assess_content_quality(ctx),
+            'length_adequacy': self._assess_length_adequacy(ctx.word_count),
+            'specificity': self._assess_specificity(ctx),
+            'confidence_level': self._assess_confidence_level(ctx)
         }
         
-        return components
+        return components, ctx.word_count
 
-    def _assess_content_quality(self, answer_lower):
+    def _assess_content_quality(self, ctx):
         """Assess the quality of content based on indicators"""
         score = 1.0
         
         # Check for negative indicators - be more strict
-        negative_count = 0
-        for category, indicators in self.quality_indicators['negative'].items():
-            for indicator in indicators:
-                if indicator in answer_lower:
-                    negative_count += 1
+        negative_count = len(ctx.negative_hits)
         
         # Penalize based on negative indicators - increased penalty
         score -= min(negative_count * 0.25, 0.8)  # Max penalty of 0.8 (increased from 0.6)
         
         # Boost for positive indicators
-        positive_count = 0
-        for category, indicators in self.quality_indicators['positive'].items():
-            for indicator in indicators:
-                if indicator in answer_lower:
-                    positive_count += 1
+        positive_count = len(ctx.positive_hits)
         
         # Boost based on positive indicators
         score += min(positive_count * 0.1, 0.3)  # Max boost of 0.3
@@ -145,16 +190,9 @@ class AnswerEvaluator:
             # Good length range
             return 1.0
 
-    def _assess_specificity(self, answer_lower):
+    def _assess_specificity(self, ctx):
         """Assess how specific and detailed the answer is"""
-        # Look for specific details, examples, numbers
-        specificity_indicators = [
-            'for example', 'specifically', 'such as', 'including',
-            'step 1', 'step 2', 'first', 'second', 'third',
-            'percent', '%', 'number', 'amount'
-        ]
-        
-        specific_count = sum(1 for indicator in specificity_indicators if indicator in answer_lower)
+        specific_count = len(ctx.specificity_hits)
         
         # Convert count to score
         if specific_count >= 3:
@@ -164,15 +202,13 @@ class AnswerEvaluator:
         else:
             return 0.5  # Base score for general answers
 
-    def _assess_confidence_level(self, answer_lower):
+    def _assess_confidence_level(self, ctx):
         """Assess the confidence level of the answer"""
         # High confidence indicators
-        high_confidence = sum(1 for indicator in self.quality_indicators['positive']['confidence'] 
-                            if indicator in answer_lower)
+        high_confidence = len(ctx.positive_hits & self._confidence_indicators)
         
         # Low confidence indicators  
-        low_confidence = sum(1 for indicator in self.quality_indicators['negative']['uncertainty'] 
-                           if indicator in answer_lower)
+        low_confidence = len(ctx.negative_hits & self._uncertainty_indicators)
         
         if low_confidence > high_confidence:
             return 0.2  # Low confidence (reduced from 0.3)
@@ -225,20 +261,21 @@ class AnswerEvaluator:
         upgrade_keywords = ['gpt-3.5', '3.5', 'turbo', 'openai-3.5', 'openai-gpt']
         return any(keyword in normalized for keyword in upgrade_keywords)
 
-    def get_evaluation_details(self, response_obj, original_prompt):
-        """Get detailed evaluation breakdown for debugging"""
-        evaluation = self.evaluate_answer(response_obj, original_prompt)
+    def get_evaluation_details(self, response_obj, original_prompt, evaluation=None):
+        """Get detailed evaluation breakdown for debugging, reusing evaluation when already computed"""
+        if evaluation is None:
+            evaluation = self.evaluate_answer(response_obj, original_prompt)
         
         answer = response_obj.get('answer', '')
         quality_components = evaluation['quality_breakdown']
         
         details = {
             'answer_preview': answer[:100] + "..." if len(answer) > 100 else answer,
-            'word_count': len(answer.split()),
+            'word_count': evaluation['evaluation_details']['word_count'],
             'quality_components': quality_components,
             'overall_quality': evaluation['quality'],
             'meets_upgrade_threshold': evaluation['quality'] >= self.thresholds['upgrade_threshold'],
-            'can_upgrade': self._can_upgrade(response_obj.get('llm_used') or response_obj.get('model_metadata', {}).get('llm_used', 'unknown')),
+            'can_upgrade': evaluation['evaluation_details']['can_upgrade'],
             'recommendation': 'upgrade' if evaluation['needs_upgrade'] else 'keep'
         }
         
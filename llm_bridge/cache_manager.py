@@ -7,12 +7,15 @@ import json
 import time
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Union, Any
-from sentence_transformers import SentenceTransformer
 from config import DEV_MODE
-from sklearn.metrics.pairwise import cosine_similarity
-from data_layer.mongoHandler import MongoDBHandler
+from data_layer.mongoHandler import get_db_handler, get_embedding_model
 import re
 
+def _cosine_similarities(matrix: np.ndarray, vector: np.ndarray) -> np.ndarray:
+    """Cosine similarity of each row of matrix with vector (0 for zero-length rows)."""
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+    return (matrix @ vector) / np.where(norms == 0, 1.0, norms)
+
 class LocalCacheManager:
     def __init__(self, cache_dir: str = './cache', max_retries: int = 3, retry_delay: int = 1):
         """
@@ -37,13 +40,8 @@ class LocalCacheManager:
             'errors': 0
         }
 
-        # Initialize sentence embedding model
-        try:
-            self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-            print("✅ Embedding model loaded")
-        except Exception as e:
-            print(f"❌ Failed to load embedding model: {e}")
-            self.embedding_model = None
+        # Sentence embedding model, loaded on the first semantic lookup or store
+        self._embedding_model_failed = False
 
         # Ensure cache directory exists
         os.makedirs(self.cache_dir, exist_ok=True)
@@ -59,28 +57,19 @@ class LocalCacheManager:
         else:
             print("⚠️ MongoDB fallback is unavailable")
     
-    def _init_mongodb(self) -> Optional[MongoDBHandler]:
-        """Initialize MongoDB connection with retry logic"""
-        for attempt in range(self.max_retries):
-            try:
-                handler = MongoDBHandler()
-                # Test the connection
-                handler.db.command('ping')
-                self.mongo_available = True
-                if DEV_MODE:
-                    print("✅ MongoDB connection successful")
-                return handler
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    if DEV_MODE:
-                        print(f"⚠️ MongoDB connection attempt {attempt + 1} failed, retrying in {self.retry_delay}s...")
-                    time.sleep(self.retry_delay)
-                else:
-                    if DEV_MODE:
-                        print(f"❌ Failed to connect to MongoDB after {self.max_retries} attempts: {e}")
-                    self.mongo_available = False
-                    return None
-    
+    @property
+    def embedding_model(self):
+        """Shared sentence embedding model, loaded on first use instead of at construction"""
+        if self._embedding_model_failed:
+            return None
+        try:
+            # Same instance as the MongoDB handler, so both caches embed identically
+            return get_embedding_model()
+        except Exception as e:
+            print(f"❌ Failed to load embedding model: {e}")
+            self._embedding_model_failed = True
+            return None
+
     def _validate_prompt(self, prompt: Any) -> Tuple[bool, str]:
         """Validate the prompt input"""
         if not isinstance(prompt, str):
@@ -225,10 +214,11 @@ class LocalCacheManager:
             print("✅ Created new cache index")
 
     def _init_mongodb(self):
-        """Attempt to initialize the MongoDBHandler safely."""
+        """Attempt to get the shared MongoDB handler safely."""
         try:
-            from data_layer.mongoHandler import MongoDBHandler
-            return MongoDBHandler()
+            handler = get_db_handler()
+            self.mongo_available = True
+            return handler
         except Exception as e:
             print(f"⚠️ Failed to initialize MongoDBHandler: {e}")
             return None
@@ -375,8 +365,8 @@ class LocalCacheManager:
                 return None, False, 0.0
                 
             # Generate query embedding (only for the prompt, not composite key)
-            query_embedding = self.embedding_model.encode(prompt).reshape(1, -1)
-            embeddings = np.array(self.index['embeddings'])
+            query_embedding = self.embedding_model.encode(prompt).astype(np.float32)
+            embeddings = np.array(self.index['embeddings'], dtype=np.float32)
 
             if len(embeddings) == 0:
                 self.stats['misses'] += 1
@@ -414,11 +404,11 @@ class LocalCacheManager:
         
             # Calculate similarities only for valid indices
             valid_embeddings = embeddings[valid_indices]
-            similarities = cosine_similarity(valid_embeddings, query_embedding)
+            similarities = _cosine_similarities(valid_embeddings, query_embedding)
         
             # Find best match
-            max_idx_in_valid = np.argmax(similarities)
-            max_similarity = float(similarities[max_idx_in_valid][0])
+            max_idx_in_valid = int(np.argmax(similarities))
+            max_similarity = float(similarities[max_idx_in_valid])
         
             # Check if the best match meets the threshold
             if max_similarity >= threshold:
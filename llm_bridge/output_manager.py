@@ -6,12 +6,16 @@
 
 import time
 import json
-from data_layer.mongoHandler import MongoDBHandler
+from data_layer.mongoHandler import get_db_handler
 
 class OutputManager:
     def __init__(self, cache_manager):
         self.cache_manager = cache_manager
-        self.db_handler = MongoDBHandler()
+
+    @property
+    def db_handler(self):
+        """Shared MongoDB handler, connected on the first save instead of at construction"""
+        return get_db_handler()
 
     # Prepare output and store in cache and MongoDB 
     def prepare_output(self, original_json, enhanced_prompt, response_obj, evaluation, additional_info=None):
@@ -97,7 +101,8 @@ class OutputManager:
                     print(f" user_id: {user_id}")
                     print(f" question: {initial_prompt}")
                     print(f" answer: {response_content}")
-                    self.db_handler.save_qa_record(
+                    # Saved in the background so the answer isn't held up by the write
+                    self.db_handler.enqueue_qa_record(
                         user_id=user_id,
                         question=initial_prompt,
                         answer=response_content,
@@ -114,7 +119,7 @@ class OutputManager:
                             "question_id": original_json.get('question_id'),
                         }
                     )
-                    print("MongoDB save succeeded")
+                    print("MongoDB save queued")
                 except Exception as e:
                     print(f"MongoDB save failed: {e}")
 